@@ -1,8 +1,12 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import joblib
 from pathlib import Path
 
+from batch_score import score_frame
+from telco_data import FEATURE_COLUMNS, prepare_features
+
 
 MODEL_PATH = Path(__file__).resolve().parent / "churn_model_pipeline.pkl"
 
@@ -17,6 +21,39 @@ def load_model():
 
 model = load_model()
 
+CONTRACT_OPTIONS = ["Month-to-month", "One year", "Two year"]
+
+# Values scanned by the what-if sweep, matching the ranges of the input widgets.
+WHAT_IF_RANGES = {
+    "tenure": np.arange(0, 101),
+    "MonthlyCharges": np.linspace(0.0, 200.0, 201),
+    "Contract": CONTRACT_OPTIONS,
+}
+
+
+def normalize_inputs(record):
+    return tuple(
+        float(record[col]) if isinstance(record[col], (int, float)) else str(record[col]).strip()
+        for col in FEATURE_COLUMNS
+    )
+
+
+# Keyed on the normalized input tuple; Streamlit evicts the least recently used entries.
+@st.cache_data(max_entries=256, show_spinner=False)
+def predict_cached(inputs):
+    input_data = prepare_features(pd.DataFrame([inputs], columns=FEATURE_COLUMNS))
+    prediction, pred_proba = score_frame(load_model(), input_data)
+    return int(prediction[0]), float(pred_proba[0])
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def what_if_curve(inputs, feature):
+    values = WHAT_IF_RANGES[feature]
+    grid = pd.DataFrame([inputs] * len(values), columns=FEATURE_COLUMNS)
+    grid[feature] = values
+    _, pred_proba = score_frame(load_model(), prepare_features(grid))
+    return pd.DataFrame({feature: values, "Churn Probability": pred_proba})
+
 
 st.set_page_config(page_title="Customer Churn Prediction", layout="centered")
 st.title("📊 Telco Customer Churn Prediction")
@@ -46,7 +83,7 @@ with col2:
 
 with col1:
     internet_service = st.selectbox("Internet Service", ["DSL", "Fiber optic", "No"])
-    contract = st.selectbox("Contract Type", ["Month-to-month", "One year", "Two year"])
+    contract = st.selectbox("Contract Type", CONTRACT_OPTIONS)
     gender = st.selectbox("Gender", ["Male", "Female"])
 
 with col2:
@@ -62,40 +99,36 @@ with col1:
 with col2:
     total_charges = st.number_input("Total Charges ($)", min_value=0.0, max_value=10000.0, value=1000.0)
 
+customer = {
+    'gender': gender,
+    'SeniorCitizen': 0,
+    'Partner': yes_no_inputs['Partner'],
+    'Dependents': yes_no_inputs['Dependents'],
+    'tenure': tenure,
+    'PhoneService': yes_no_inputs['PhoneService'],
+    'MultipleLines': yes_no_inputs['MultipleLines'],
+    'InternetService': internet_service,
+    'OnlineSecurity': yes_no_inputs['OnlineSecurity'],
+    'OnlineBackup': yes_no_inputs['OnlineBackup'],
+    'DeviceProtection': yes_no_inputs['DeviceProtection'],
+    'TechSupport': yes_no_inputs['TechSupport'],
+    'StreamingTV': yes_no_inputs['StreamingTV'],
+    'StreamingMovies': yes_no_inputs['StreamingMovies'],
+    'Contract': contract,
+    'PaperlessBilling': yes_no_inputs['PaperlessBilling'],
+    'PaymentMethod': payment_method,
+    'MonthlyCharges': monthly_charges,
+    'TotalCharges': total_charges
+}
+inputs = normalize_inputs(customer)
+
 if st.button("🔍 Predict Churn"):
     try:
-    
-        binary_mapped = {k: 1 if v == "Yes" else 0 for k, v in yes_no_inputs.items()}
-
-        input_data = pd.DataFrame({
-            'gender': [gender],
-            'SeniorCitizen': [0],
-            'Partner': [binary_mapped['Partner']],
-            'Dependents': [binary_mapped['Dependents']],
-            'tenure': [tenure],
-            'PhoneService': [binary_mapped['PhoneService']],
-            'MultipleLines': [binary_mapped['MultipleLines']],
-            'InternetService': [internet_service],
-            'OnlineSecurity': [binary_mapped['OnlineSecurity']],
-            'OnlineBackup': [binary_mapped['OnlineBackup']],
-            'DeviceProtection': [binary_mapped['DeviceProtection']],
-            'TechSupport': [binary_mapped['TechSupport']],
-            'StreamingTV': [binary_mapped['StreamingTV']],
-            'StreamingMovies': [binary_mapped['StreamingMovies']],
-            'Contract': [contract],
-            'PaperlessBilling': [binary_mapped['PaperlessBilling']],
-            'PaymentMethod': [payment_method],
-            'MonthlyCharges': [monthly_charges],
-            'TotalCharges': [total_charges]
-        })
-
-        
-        prediction = model.predict(input_data)
-        pred_proba = model.predict_proba(input_data)[0][1]
+        prediction, pred_proba = predict_cached(inputs)
 
         churn_label = (
             "❌ Customer will likely **CHURN**"
-            if prediction[0] == 1
+            if prediction == 1
             else "✅ Customer will **NOT** churn"
         )
 
@@ -103,7 +136,27 @@ if st.button("🔍 Predict Churn"):
         st.write(f"**Churn Probability:** {pred_proba:.2%}")
 
         with st.expander("📋 Input Data Preview"):
-            st.dataframe(input_data)
+            st.dataframe(pd.DataFrame([customer]))
 
     except Exception as e:
         st.error(f"Error during prediction: {e}")
+
+
+st.header("📈 What-If Analysis")
+st.write("Vary one feature across its whole range, keeping the other details above fixed.")
+
+what_if_feature = st.selectbox("Feature to vary", list(WHAT_IF_RANGES))
+
+if st.button("📉 Run What-If"):
+    try:
+        curve = what_if_curve(inputs, what_if_feature)
+        if what_if_feature == "Contract":
+            st.bar_chart(curve, x=what_if_feature, y="Churn Probability")
+        else:
+            st.line_chart(curve, x=what_if_feature, y="Churn Probability")
+
+        with st.expander("📋 What-If Scores"):
+            st.dataframe(curve)
+
+    except Exception as e:
+        st.error(f"Error during what-if analysis: {e}")
@@ -0,0 +1,83 @@
+"""Score a Telco-format CSV with the saved churn pipeline.
+
+Usage:
+    python batch_score.py customers.csv predictions.csv --chunksize 50000
+"""
+import argparse
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from telco_data import BASE_DIR, ID_COLUMN, prepare_features, read_telco_csv
+
+
+MODEL_PATH = BASE_DIR / "churn_model_pipeline.pkl"
+
+OUTPUT_COLUMNS = [ID_COLUMN, "churn_prediction", "churn_probability"]
+
+
+def load_model(path=MODEL_PATH):
+    return joblib.load(path)
+
+
+def score_frame(model, X):
+    """Return (labels, churn probabilities) from a single predict_proba pass."""
+    proba = model.predict_proba(X)
+    labels = model.classes_[np.argmax(proba, axis=1)]
+    return labels, proba[:, 1]
+
+
+def score_chunk(model, chunk, offset=0):
+    """Score one chunk; without a customerID column rows are identified by `offset` + their index."""
+    labels, proba = score_frame(model, prepare_features(chunk))
+    ids = chunk[ID_COLUMN] if ID_COLUMN in chunk.columns else pd.Series(chunk.index + offset, index=chunk.index)
+    return pd.DataFrame({
+        ID_COLUMN: ids.to_numpy(),
+        "churn_prediction": labels,
+        "churn_probability": proba,
+    })
+
+
+def iter_scored_chunks(model, input_path, chunksize=50_000):
+    for chunk in read_telco_csv(input_path, chunksize=chunksize):
+        yield score_chunk(model, chunk)
+
+
+def score_csv(input_path, output_path, chunksize=50_000, model=None):
+    """Stream `input_path` through the model chunk by chunk into `output_path`.
+
+    Only one chunk is held in memory at a time. Returns the number of rows scored.
+    """
+    if model is None:
+        model = load_model()
+
+    rows = 0
+    with open(output_path, "w", newline="") as out:
+        header = True
+        for scored in iter_scored_chunks(model, input_path, chunksize):
+            scored.to_csv(out, header=header, index=False, float_format="%.6f")
+            header = False
+            rows += len(scored)
+        if header:
+            pd.DataFrame(columns=OUTPUT_COLUMNS).to_csv(out, index=False)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch-score a Telco customer CSV for churn.")
+    parser.add_argument("input", help="CSV with the Telco dataset schema")
+    parser.add_argument("output", help="where to write customerID, churn_prediction, churn_probability")
+    parser.add_argument("--chunksize", type=int, default=50_000, help="rows scored per pipeline call")
+    parser.add_argument("--model", default=str(MODEL_PATH), help="path to the saved pipeline")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows = score_csv(args.input, args.output, args.chunksize, load_model(args.model))
+    elapsed = time.perf_counter() - start
+    print(f"Scored {rows} rows in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/sec) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""Pandas-free fast path for the fitted churn pipeline.
+
+`export_pipeline` flattens churn_model_pipeline.pkl (imputer statistics, scaler
+moments, one-hot category tables and the classifier's coefficients or trees)
+into plain NumPy arrays saved as an .npz file. `FastChurnPredictor` loads
+those arrays and scores dicts, lists of dicts or NumPy record arrays directly,
+skipping DataFrame construction and ColumnTransformer dispatch. The .npz
+records the SHA-256 of the pipeline file it came from, and loading it next to
+a different (retrained) pipeline raises `StaleModelError`.
+
+Usage:
+    python fast_predictor.py export            # writes churn_fast_model.npz
+    python fast_predictor.py parity            # compares against the sklearn pipeline
+"""
+import argparse
+import sys
+import time
+
+import joblib
+import numpy as np
+
+from batch_score import MODEL_PATH
+from telco_data import BASE_DIR, DATASET_PATH, file_sha256, load_telco, prepare_features
+
+
+FAST_MODEL_PATH = BASE_DIR / "churn_fast_model.npz"
+NUMERICAL_FEATURES_PATH = BASE_DIR / "numerical_features.pkl"
+CATEGORICAL_FEATURES_PATH = BASE_DIR / "categorical_features.pkl"
+
+_YES_NO = {"Yes": 1.0, "No": 0.0}
+
+
+class StaleModelError(ValueError):
+    pass
+
+
+def _flatten_trees(trees, normalize):
+    left, right, feature, threshold, value, roots = [], [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        t = tree.tree_
+        roots.append(offset)
+        is_leaf = t.children_left == -1
+        left.append(np.where(is_leaf, -1, t.children_left + offset))
+        right.append(np.where(is_leaf, -1, t.children_right + offset))
+        feature.append(np.where(is_leaf, 0, t.feature))
+        threshold.append(t.threshold)
+        v = t.value[:, 0, :]
+        if normalize:
+            v = v / v.sum(axis=1, keepdims=True)
+        value.append(v[:, 1] if normalize else v[:, 0])
+        offset += t.node_count
+    return {
+        "tree_roots": np.array(roots, dtype=np.int64),
+        "tree_left": np.concatenate(left).astype(np.int64),
+        "tree_right": np.concatenate(right).astype(np.int64),
+        "tree_feature": np.concatenate(feature).astype(np.int64),
+        "tree_threshold": np.concatenate(threshold).astype(np.float64),
+        "tree_value": np.concatenate(value).astype(np.float64),
+    }
+
+
+def _export_classifier(clf):
+    name = type(clf).__name__
+    if len(clf.classes_) != 2:
+        raise ValueError("Only binary churn classifiers can be exported.")
+
+    if hasattr(clf, "coef_"):
+        return {"kind": np.array("linear"), "coef": clf.coef_[0].astype(np.float64),
+                "intercept": np.array(clf.intercept_[0], dtype=np.float64)}
+
+    if name == "RandomForestClassifier":
+        return {"kind": np.array("forest"), **_flatten_trees(clf.estimators_, normalize=True)}
+
+    if name == "GradientBoostingClassifier":
+        prior = getattr(clf.init_, "class_prior_", None)
+        if prior is None:
+            raise ValueError("GradientBoostingClassifier must use the default prior init.")
+        return {"kind": np.array("boosting"),
+                "init_raw": np.array(np.log(prior[1] / prior[0]), dtype=np.float64),
+                "learning_rate": np.array(clf.learning_rate, dtype=np.float64),
+                **_flatten_trees(clf.estimators_[:, 0], normalize=False)}
+
+    raise ValueError(f"Don't know how to export a {name}.")
+
+
+def export_pipeline(pipeline=None, path=FAST_MODEL_PATH, source_path=MODEL_PATH):
+    """Flatten the fitted sklearn pipeline saved at `source_path` into arrays and save them to `path`."""
+    if pipeline is None:
+        pipeline = joblib.load(source_path)
+    numerical_features = joblib.load(NUMERICAL_FEATURES_PATH)
+    categorical_features = joblib.load(CATEGORICAL_FEATURES_PATH)
+
+    preprocessor = pipeline.named_steps["preprocessor"]
+    num_pipe = preprocessor.named_transformers_["num"]
+    cat_pipe = preprocessor.named_transformers_["cat"]
+    num_columns = list(preprocessor.transformers_[0][2])
+    cat_columns = list(preprocessor.transformers_[1][2])
+
+    if cat_columns != list(categorical_features) or not set(numerical_features) <= set(num_columns):
+        raise ValueError("Saved feature lists do not match the fitted ColumnTransformer.")
+
+    scaler = num_pipe.named_steps["scaler"]
+    ohe = cat_pipe.named_steps["onehot"]
+    categories = [np.asarray(c).astype(str) for c in ohe.categories_]
+
+    arrays = {
+        "num_columns": np.array(num_columns),
+        "num_medians": num_pipe.named_steps["imputer"].statistics_.astype(np.float64),
+        "num_means": scaler.mean_.astype(np.float64),
+        "num_scales": scaler.scale_.astype(np.float64),
+        "cat_columns": np.array(cat_columns),
+        "cat_fill": np.asarray(cat_pipe.named_steps["imputer"].statistics_).astype(str),
+        "cat_values": np.concatenate(categories),
+        "cat_offsets": np.cumsum([0] + [len(c) for c in categories]).astype(np.int64),
+        "classes": np.asarray(pipeline.classes_),
+        "source_sha256": np.array(file_sha256(source_path)),
+        **_export_classifier(pipeline.named_steps["clf"]),
+    }
+    np.savez(path, **arrays)
+    return path
+
+
+def _column(records, name):
+    if isinstance(records, np.ndarray):
+        return records[name]
+    return np.array([r[name] for r in records], dtype=object)
+
+
+def _to_float(values):
+    if values.dtype.kind in "biuf":
+        return values.astype(np.float64)
+    out = np.empty(len(values), dtype=np.float64)
+    for i, v in enumerate(values):
+        if v in _YES_NO:
+            out[i] = _YES_NO[v]
+        else:
+            try:
+                out[i] = float(v)
+            except (TypeError, ValueError):
+                out[i] = np.nan
+    return out
+
+
+class FastChurnPredictor:
+    """Score Telco records with arrays exported by `export_pipeline`.
+
+    Raises StaleModelError if `source_path` (None to skip the check) is not the
+    pipeline file the arrays were exported from.
+    """
+
+    def __init__(self, path=FAST_MODEL_PATH, source_path=MODEL_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {k: data[k] for k in data.files}
+        if source_path is not None:
+            exported = str(arrays["source_sha256"]) if "source_sha256" in arrays else None
+            if exported != file_sha256(source_path):
+                raise StaleModelError(f"{path} was not exported from {source_path}; "
+                                      "re-run `python fast_predictor.py export`.")
+
+        self.kind = str(arrays["kind"])
+        self.classes_ = arrays["classes"]
+        self.num_columns = [str(c) for c in arrays["num_columns"]]
+        self.num_medians = arrays["num_medians"]
+        self.num_means = arrays["num_means"]
+        self.num_scales = arrays["num_scales"]
+        self.cat_columns = [str(c) for c in arrays["cat_columns"]]
+        self.cat_fill = [str(c) for c in arrays["cat_fill"]]
+
+        offsets = arrays["cat_offsets"]
+        self.n_features = len(self.num_columns) + int(offsets[-1])
+        self.cat_lookup = []
+        for i in range(len(self.cat_columns)):
+            values = arrays["cat_values"][offsets[i]:offsets[i + 1]]
+            base = len(self.num_columns) + int(offsets[i])
+            self.cat_lookup.append({str(v): base + j for j, v in enumerate(values)})
+
+        if self.kind == "linear":
+            self.coef = arrays["coef"]
+            self.intercept = float(arrays["intercept"])
+        else:
+            self.tree_roots = arrays["tree_roots"]
+            self.tree_left = arrays["tree_left"]
+            self.tree_right = arrays["tree_right"]
+            self.tree_feature = arrays["tree_feature"]
+            self.tree_threshold = arrays["tree_threshold"]
+            self.tree_value = arrays["tree_value"]
+            if self.kind == "boosting":
+                self.init_raw = float(arrays["init_raw"])
+                self.learning_rate = float(arrays["learning_rate"])
+
+    def transform(self, records):
+        """Build the preprocessed design matrix the classifier was fitted on."""
+        if isinstance(records, dict):
+            records = [records]
+        n = len(records)
+        X = np.zeros((n, self.n_features), dtype=np.float64)
+
+        for j, col in enumerate(self.num_columns):
+            values = _to_float(_column(records, col))
+            values[np.isnan(values)] = self.num_medians[j]
+            X[:, j] = (values - self.num_means[j]) / self.num_scales[j]
+
+        rows = np.arange(n)
+        for j, col in enumerate(self.cat_columns):
+            lookup = self.cat_lookup[j]
+            fill = self.cat_fill[j]
+            idx = np.array([
+                lookup.get(fill if v is None or v != v else str(v), -1)
+                for v in _column(records, col).tolist()
+            ], dtype=np.int64)
+            known = idx >= 0
+            X[rows[known], idx[known]] = 1.0
+        return X
+
+    def _tree_sum(self, X):
+        X = X.astype(np.float32).astype(np.float64)
+        total = np.zeros(len(X), dtype=np.float64)
+        rows = np.arange(len(X))
+        for root in self.tree_roots:
+            node = np.full(len(X), root, dtype=np.int64)
+            active = self.tree_left[node] != -1
+            while active.any():
+                n = node[active]
+                go_left = X[rows[active], self.tree_feature[n]] <= self.tree_threshold[n]
+                node[active] = np.where(go_left, self.tree_left[n], self.tree_right[n])
+                active = self.tree_left[node] != -1
+            total += self.tree_value[node]
+        return total
+
+    def predict_proba(self, records):
+        X = self.transform(records)
+        if self.kind == "linear":
+            p = 1.0 / (1.0 + np.exp(-(X @ self.coef + self.intercept)))
+        elif self.kind == "forest":
+            p = self._tree_sum(X) / len(self.tree_roots)
+        else:
+            raw = self.init_raw + self.learning_rate * self._tree_sum(X)
+            p = 1.0 / (1.0 + np.exp(-raw))
+        return np.column_stack([1.0 - p, p])
+
+    def predict(self, records):
+        return self.classes_[np.argmax(self.predict_proba(records), axis=1)]
+
+
+def check_parity(pipeline=None, predictor=None, dataset_path=DATASET_PATH, atol=1e-9):
+    """Score the full Telco dataset both ways; return (max abs diff, label mismatches)."""
+    if pipeline is None:
+        pipeline = joblib.load(MODEL_PATH)
+    if predictor is None:
+        predictor = FastChurnPredictor()
+
+    X = prepare_features(load_telco(dataset_path))
+    expected = pipeline.predict_proba(X)[:, 1]
+    records = X.to_records(index=False)
+
+    got = predictor.predict_proba(records)[:, 1]
+    diff = float(np.max(np.abs(got - expected)))
+    mismatches = int(np.sum(predictor.predict(records) != pipeline.predict(X)))
+
+    dict_rows = X.head(200).to_dict("records")
+    dict_diff = float(np.max(np.abs(predictor.predict_proba(dict_rows)[:, 1] - expected[:200])))
+    return max(diff, dict_diff), mismatches
+
+
+def _benchmark_single_row(pipeline, predictor, repeats=200):
+    import pandas as pd
+
+    X = prepare_features(load_telco(DATASET_PATH).head(1))
+    record = X.to_dict("records")[0]
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        pipeline.predict_proba(pd.DataFrame([record]))
+    sklearn_ms = (time.perf_counter() - start) / repeats * 1000
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        predictor.predict_proba(record)
+    fast_ms = (time.perf_counter() - start) / repeats * 1000
+    return sklearn_ms, fast_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export and check the pandas-free churn predictor.")
+    parser.add_argument("command", choices=["export", "parity"])
+    parser.add_argument("--model", default=str(MODEL_PATH), help="path to the saved sklearn pipeline")
+    parser.add_argument("--output", default=str(FAST_MODEL_PATH), help="where the .npz arrays live")
+    parser.add_argument("--atol", type=float, default=1e-9, help="allowed probability difference")
+    args = parser.parse_args()
+
+    pipeline = joblib.load(args.model)
+    if args.command == "export":
+        export_pipeline(pipeline, args.output, args.model)
+        print(f"Exported {type(pipeline.named_steps['clf']).__name__} to {args.output}")
+        return
+
+    predictor = FastChurnPredictor(args.output, args.model)
+    diff, mismatches = check_parity(pipeline, predictor)
+    sklearn_ms, fast_ms = _benchmark_single_row(pipeline, predictor)
+    print(f"Max probability difference: {diff:.3e}  Label mismatches: {mismatches}")
+    print(f"Single-row latency: sklearn {sklearn_ms:.3f} ms, fast path {fast_ms:.3f} ms")
+    if diff > args.atol or mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Score a large Telco-format CSV across a pool of worker processes.
+
+The input is split into byte-range shards aligned to line boundaries. Every
+worker loads the pipeline once, scores its shards in chunks and writes them to
+part files, which are stitched back together in input order.
+
+Usage:
+    python parallel_score.py customers.csv predictions.csv --workers 32
+"""
+import argparse
+import csv
+import io
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from batch_score import MODEL_PATH, OUTPUT_COLUMNS, load_model, score_chunk
+from telco_data import ID_COLUMN, read_telco_csv
+
+
+_worker_model = None
+
+
+def _init_worker(model_path):
+    global _worker_model
+    _worker_model = load_model(model_path)
+
+
+def _count_lines(f, start, end, block=16 * 1024 * 1024):
+    f.seek(start)
+    lines = 0
+    while start < end:
+        data = f.read(min(block, end - start))
+        lines += data.count(b"\n")
+        start += len(data)
+    return lines
+
+
+def plan_shards(path, shard_bytes=64 * 1024 * 1024, min_shards=1, count_rows=False):
+    """Return (header, [(start, end, first_row), ...]) byte ranges covering the data rows.
+
+    Boundaries are moved forward to the next newline so no row is split.
+    With `count_rows`, `first_row` is the global index of the shard's first
+    row (an extra pass over the file); otherwise it is None.
+    Quoted fields containing newlines and blank lines are not supported (the
+    Telco export has neither).
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = f.readline()
+        data_start = f.tell()
+        data_size = size - data_start
+        if data_size <= 0:
+            return header, []
+
+        count = max(min_shards, -(-data_size // shard_bytes))
+        step = -(-data_size // count)
+        shards = []
+        start = data_start
+        while start < size:
+            end = min(start + step, size)
+            if end < size:
+                f.seek(end)
+                f.readline()
+                end = f.tell()
+            shards.append((start, end))
+            start = end
+
+        first_row = None
+        planned = []
+        for i, (start, end) in enumerate(shards):
+            if count_rows:
+                first_row = 0 if i == 0 else first_row + _count_lines(f, *shards[i - 1])
+            planned.append((start, end, first_row))
+    return header, planned
+
+
+def _score_shard(path, header, start, end, first_row, part_path, chunksize):
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    rows = 0
+    with open(part_path, "w", newline="") as out:
+        for chunk in read_telco_csv(io.BytesIO(header + data), chunksize=chunksize):
+            scored = score_chunk(_worker_model, chunk, offset=first_row or 0)
+            scored.to_csv(out, header=False, index=False, float_format="%.6f")
+            rows += len(scored)
+    return rows
+
+
+def score_csv_parallel(input_path, output_path, workers=None, chunksize=50_000,
+                       shard_bytes=64 * 1024 * 1024, model_path=MODEL_PATH):
+    """Score `input_path` with `workers` processes. Returns (rows, seconds)."""
+    workers = workers or os.cpu_count() or 1
+    start_time = time.perf_counter()
+    # Without a customerID column rows are identified by their index, so each
+    # shard needs to know where it starts to keep the ids global.
+    with open(input_path, "rb") as f:
+        has_ids = ID_COLUMN in next(csv.reader([f.readline().decode("utf-8-sig")]), [])
+    header, shards = plan_shards(input_path, shard_bytes, min_shards=workers, count_rows=not has_ids)
+
+    tmp_dir = tempfile.mkdtemp(prefix="churn_shards_")
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(str(model_path),)) as pool:
+            futures = []
+            for i, (start, end, first_row) in enumerate(shards):
+                part_path = os.path.join(tmp_dir, f"part-{i:05d}.csv")
+                futures.append((part_path, pool.submit(
+                    _score_shard, str(input_path), header, start, end, first_row, part_path, chunksize
+                )))
+
+            rows = 0
+            with open(output_path, "w", newline="") as out:
+                out.write(",".join(OUTPUT_COLUMNS) + "\n")
+                for part_path, future in futures:
+                    rows += future.result()
+                    with open(part_path, newline="") as part:
+                        shutil.copyfileobj(part, out)
+                    os.remove(part_path)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return rows, time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a Telco customer CSV for churn on multiple cores.")
+    parser.add_argument("input", help="CSV with the Telco dataset schema")
+    parser.add_argument("output", help="where to write customerID, churn_prediction, churn_probability")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--chunksize", type=int, default=50_000, help="rows scored per pipeline call")
+    parser.add_argument("--shard-mb", type=int, default=64, help="target shard size in megabytes")
+    parser.add_argument("--model", default=str(MODEL_PATH), help="path to the saved pipeline")
+    args = parser.parse_args()
+
+    rows, elapsed = score_csv_parallel(
+        args.input, args.output, workers=args.workers, chunksize=args.chunksize,
+        shard_bytes=args.shard_mb * 1024 * 1024, model_path=args.model,
+    )
+    print(f"Scored {rows} rows with {args.workers} workers in {elapsed:.2f}s "
+          f"({rows / max(elapsed, 1e-9):,.0f} rows/sec) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Standalone JSON scoring service for the churn pipeline.
+
+The model is loaded once at startup. Concurrent requests are collected for up
+to --batch-window-ms and scored together in one predict_proba call.
+
+Usage:
+    python serve.py --port 8080 --batch-window-ms 5
+
+    curl -X POST localhost:8080/predict -d '{"gender": "Female", "SeniorCitizen": 0, ...}'
+"""
+import argparse
+import json
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+from batch_score import MODEL_PATH, load_model, score_frame
+from telco_data import BINARY_COLUMNS, FEATURE_COLUMNS, NUMERICAL_COLUMNS
+
+
+class InvalidRecord(ValueError):
+    pass
+
+
+def _number(col, value, blank_ok=False):
+    if blank_ok and (value is None or (isinstance(value, str) and not value.strip())):
+        return math.nan  # zero-tenure customers have no TotalCharges; the pipeline imputes it
+    if isinstance(value, bool):
+        raise InvalidRecord(f"{col} must be a number, got {value!r}")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise InvalidRecord(f"{col} must be a number, got {value!r}") from None
+    if not math.isfinite(number):
+        raise InvalidRecord(f"{col} must be a finite number, got {value!r}")
+    return number
+
+
+def normalize_record(record):
+    """Order a record's fields as the pipeline expects, with numeric columns converted and checked."""
+    if not isinstance(record, dict):
+        raise InvalidRecord("each record must be a JSON object")
+    missing = [col for col in FEATURE_COLUMNS if col not in record]
+    if missing:
+        raise InvalidRecord(f"missing columns: {', '.join(missing)}")
+    row = [record[col] for col in FEATURE_COLUMNS]
+    for col in BINARY_COLUMNS:
+        i = FEATURE_COLUMNS.index(col)
+        if row[i] in ("Yes", "No"):
+            row[i] = 1 if row[i] == "Yes" else 0
+        elif isinstance(row[i], bool) or row[i] not in (0, 1):
+            raise InvalidRecord(f"{col} must be Yes/No or 1/0, got {row[i]!r}")
+    for col in NUMERICAL_COLUMNS:
+        i = FEATURE_COLUMNS.index(col)
+        row[i] = _number(col, row[i], blank_ok=col == "TotalCharges")
+    return row
+
+
+class MicroBatcher:
+    """Queue rows from many callers and score them in shared predict_proba calls."""
+
+    def __init__(self, model, window=0.005, max_batch_size=1024):
+        self.model = model
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, rows):
+        future = Future()
+        self._queue.put((rows, future))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = time.perf_counter() + self.window
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _score(self, rows):
+        labels, proba = score_frame(self.model, pd.DataFrame(rows, columns=FEATURE_COLUMNS))
+        return [
+            {"churn_prediction": int(label), "churn_probability": float(p)}
+            for label, p in zip(labels, proba)
+        ]
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                results = self._score([row for item_rows, _ in batch for row in item_rows])
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                    continue
+                # Re-score each request on its own so one bad record only fails its own request.
+                for item_rows, future in batch:
+                    try:
+                        future.set_result(self._score(item_rows))
+                    except Exception as error:
+                        future.set_exception(error)
+                continue
+
+            offset = 0
+            for item_rows, future in batch:
+                end = offset + len(item_rows)
+                future.set_result(results[offset:end])
+                offset = end
+
+
+class ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def make_handler(batcher, timeout=10.0):
+    class ScoringHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, {"status": "ok"})
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._send_json(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"null")
+                single = isinstance(payload, dict)
+                records = [payload] if single else payload
+                if not isinstance(records, list) or not records:
+                    raise InvalidRecord("expected a record or a non-empty array of records")
+                rows = [normalize_record(r) for r in records]
+            except (ValueError, InvalidRecord) as e:
+                self._send_json(400, {"error": str(e)})
+                return
+
+            try:
+                results = batcher.submit(rows).result(timeout=timeout)
+            except Exception as e:
+                self._send_json(500, {"error": f"Error during prediction: {e}"})
+                return
+            self._send_json(200, results[0] if single else {"predictions": results})
+
+    return ScoringHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve churn predictions over HTTP.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--batch-window-ms", type=float, default=5.0,
+                        help="how long to wait for more requests before scoring a batch")
+    parser.add_argument("--max-batch-size", type=int, default=1024, help="rows per predict_proba call")
+    parser.add_argument("--model", default=str(MODEL_PATH), help="path to the saved pipeline")
+    args = parser.parse_args()
+
+    batcher = MicroBatcher(load_model(args.model), args.batch_window_ms / 1000, args.max_batch_size)
+    server = ScoringServer((args.host, args.port), make_handler(batcher))
+    print(f"Serving churn predictions on http://{args.host}:{args.port}/predict")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
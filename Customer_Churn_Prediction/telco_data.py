@@ -0,0 +1,144 @@
+"""Typed loading of Telco-format customer data, shared by training, scoring and the app.
+
+The CSV is parsed once with explicit dtypes (categoricals for the service
+columns, int8 for the Yes/No flags, float32 for charges). The result is kept
+as an uncompressed Arrow snapshot named after the source file's SHA-256, so
+later loads of an unchanged file memory-map the snapshot instead of
+re-parsing the CSV. Numeric columns without missing values come back as
+read-only views into the map; strings, categories and columns with gaps are
+converted. Copy a frame (as `prepare_features` does) before writing to it.
+"""
+import hashlib
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # snapshots are an optimisation, plain CSV parsing still works
+    feather = None
+
+
+BASE_DIR = Path(__file__).resolve().parent
+DATASET_PATH = BASE_DIR / "dataset" / "WA_Fn-UseC_-Telco-Customer-Churn.csv"
+SNAPSHOT_DIR = BASE_DIR / ".data_cache"
+
+ID_COLUMN = "customerID"
+TARGET_COLUMN = "Churn"
+
+FEATURE_COLUMNS = [
+    'gender', 'SeniorCitizen', 'Partner', 'Dependents', 'tenure',
+    'PhoneService', 'MultipleLines', 'InternetService', 'OnlineSecurity',
+    'OnlineBackup', 'DeviceProtection', 'TechSupport', 'StreamingTV',
+    'StreamingMovies', 'Contract', 'PaperlessBilling', 'PaymentMethod',
+    'MonthlyCharges', 'TotalCharges'
+]
+
+# Yes/No columns the notebook mapped to 1/0 before fitting the pipeline.
+BINARY_COLUMNS = ['Partner', 'Dependents', 'PhoneService', 'PaperlessBilling']
+NUMERICAL_COLUMNS = ['SeniorCitizen', 'tenure', 'MonthlyCharges', 'TotalCharges']
+CATEGORICAL_COLUMNS = [c for c in FEATURE_COLUMNS if c not in NUMERICAL_COLUMNS + BINARY_COLUMNS]
+
+CSV_DTYPES = {
+    ID_COLUMN: "string",
+    "SeniorCitizen": "int8",
+    "tenure": "int16",
+    "MonthlyCharges": "float32",
+    "TotalCharges": "float32",
+    **{c: "category" for c in CATEGORICAL_COLUMNS + BINARY_COLUMNS + [TARGET_COLUMN]},
+}
+# Customers with zero tenure have a blank TotalCharges in the Telco export.
+NA_VALUES = {"TotalCharges": [" ", ""]}
+
+_YES_NO = {"Yes": 1, "No": 0}
+
+
+def _yes_no_to_int8(s):
+    codes = s.map(_YES_NO)
+    if codes.isna().any():
+        return codes.astype("float32")
+    return codes.astype("int8")
+
+
+def _finish(df):
+    for col in BINARY_COLUMNS + [TARGET_COLUMN]:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = _yes_no_to_int8(df[col].astype(object))
+    return df
+
+
+def read_telco_csv(source, chunksize=None, usecols=None):
+    """Parse a Telco-format CSV (path or buffer) with the typed schema.
+
+    With `chunksize` this yields typed DataFrames one chunk at a time.
+    """
+    dtypes = {c: t for c, t in CSV_DTYPES.items() if usecols is None or c in usecols}
+    reader = pd.read_csv(source, dtype=dtypes, na_values=NA_VALUES, keep_default_na=True,
+                         usecols=usecols, chunksize=chunksize)
+    if chunksize is None:
+        return _finish(reader)
+    return (_finish(chunk) for chunk in reader)
+
+
+def file_sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def snapshot_path(path, snapshot_dir=SNAPSHOT_DIR):
+    path = Path(path)
+    return Path(snapshot_dir) / f"{path.stem}-{file_sha256(path)[:16]}.arrow"
+
+
+def load_telco(path=DATASET_PATH, snapshot_dir=SNAPSHOT_DIR, use_snapshot=True):
+    """Load a Telco-format CSV, going through the hashed Arrow snapshot when possible."""
+    if not use_snapshot or feather is None:
+        return read_telco_csv(path)
+
+    snap = snapshot_path(path, snapshot_dir)
+    if snap.exists():
+        # split_blocks keeps each column in its own block, so pandas can wrap the mapped buffers
+        # instead of consolidating (copying) them; self_destruct frees the Arrow side as it goes.
+        return feather.read_table(snap, memory_map=True).to_pandas(split_blocks=True, self_destruct=True)
+
+    df = read_telco_csv(path)
+    snap.parent.mkdir(parents=True, exist_ok=True)
+    tmp = snap.with_suffix(".tmp")
+    feather.write_feather(df, tmp, compression="uncompressed")
+    tmp.replace(snap)
+    return df
+
+
+def prepare_features(df):
+    """Turn raw or typed Telco rows into the 19 columns the pipeline was fitted on."""
+    X = df[FEATURE_COLUMNS].copy()
+    if not pd.api.types.is_numeric_dtype(X["TotalCharges"]):
+        X["TotalCharges"] = pd.to_numeric(X["TotalCharges"], errors="coerce")
+    for col in BINARY_COLUMNS:
+        if not pd.api.types.is_numeric_dtype(X[col]):
+            X[col] = X[col].astype(object).map(_YES_NO)
+    # Score in float64 like the fitted pipeline instead of letting sklearn downcast to float32.
+    X[["MonthlyCharges", "TotalCharges"]] = X[["MonthlyCharges", "TotalCharges"]].astype(np.float64)
+    return X
+
+
+def _compare(path=DATASET_PATH):
+    start = time.perf_counter()
+    raw = pd.read_csv(path)
+    csv_seconds = time.perf_counter() - start
+
+    load_telco(path)
+    start = time.perf_counter()
+    typed = load_telco(path)
+    snapshot_seconds = time.perf_counter() - start
+
+    raw_mb = raw.memory_usage(deep=True).sum() / 1e6
+    typed_mb = typed.memory_usage(deep=True).sum() / 1e6
+    print(f"Default read_csv: {csv_seconds * 1000:.1f} ms, {raw_mb:.2f} MB")
+    print(f"Typed snapshot:   {snapshot_seconds * 1000:.1f} ms, {typed_mb:.2f} MB")
+
+
+if __name__ == "__main__":
+    _compare()
@@ -0,0 +1,44 @@
+"""Parity of the pandas-free fast path with the saved sklearn pipeline on the full Telco dataset.
+
+    python -m unittest test_fast_predictor        # from Customer_Churn_Prediction/
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+import joblib
+
+from batch_score import MODEL_PATH
+from fast_predictor import FastChurnPredictor, StaleModelError, check_parity, export_pipeline
+from telco_data import DATASET_PATH
+
+ATOL = 1e-9
+
+
+@unittest.skipUnless(MODEL_PATH.exists() and DATASET_PATH.exists(), "needs churn_model_pipeline.pkl and the dataset")
+class FastPredictorParityTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pipeline = joblib.load(MODEL_PATH)
+        tmp = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(tmp.cleanup)
+        cls.npz = Path(tmp.name) / "churn_fast_model.npz"
+        export_pipeline(cls.pipeline, cls.npz, MODEL_PATH)
+
+    def test_matches_the_pipeline_on_the_full_dataset(self):
+        predictor = FastChurnPredictor(self.npz, MODEL_PATH)
+        diff, mismatches = check_parity(self.pipeline, predictor, DATASET_PATH, ATOL)
+
+        self.assertLessEqual(diff, ATOL)
+        self.assertEqual(mismatches, 0)
+
+    def test_refuses_arrays_from_another_pipeline(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            other = Path(tmp) / "churn_model_pipeline.pkl"
+            other.write_bytes(MODEL_PATH.read_bytes() + b"retrained")
+            with self.assertRaises(StaleModelError):
+                FastChurnPredictor(self.npz, other)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,27 @@
+import multiprocessing
+import os
+import sys
+import threading
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from . import catalog, rollups
+
+        catalog.connect_signals()
+        rollups.connect_signals()
+        if not settings.INFERENCE_WARMUP or multiprocessing.current_process().name != "MainProcess":
+            return
+        # Only server processes warm up: not migrate, shell, tests or runserver's autoreloader parent.
+        if os.path.basename(sys.argv[0]) == "manage.py":
+            if sys.argv[1:2] != ["runserver"] or os.environ.get("RUN_MAIN") != "true":
+                return
+        from .inference import get_service
+
+        threading.Thread(target=lambda: get_service().warm_up(), name="inference-warmup", daemon=True).start()
@@ -0,0 +1,96 @@
+"""Async versions of the upload, records and summary endpoints for ASGI servers.
+
+Under uvicorn/daphne these run on the event loop: queries use Django's async
+ORM and uploads wait on the inference pool without holding a thread, so one
+process can keep many slow requests in flight. They answer exactly like their
+DRF counterparts in views.py, including JWT authentication and the records
+pagination and ETag headers.
+"""
+import asyncio
+import functools
+from datetime import date
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from . import rollups
+from .imaging import InvalidImage
+from .inference import InferenceUnavailable, get_service
+from .records import RecordError, apage_records
+from .views import records_start, records_validators
+
+
+_jwt = JWTAuthentication()
+
+
+def jwt_required(view):
+    """Authenticate the Bearer token as the DRF views do, without blocking the event loop."""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            auth = await sync_to_async(_jwt.authenticate)(request)
+        except AuthenticationFailed as e:
+            auth, detail = None, e.detail
+        else:
+            detail = "Authentication credentials were not provided."
+        if auth is None:
+            response = JsonResponse(detail if isinstance(detail, dict) else {"detail": detail}, status=401)
+            response["WWW-Authenticate"] = _jwt.authenticate_header(request)
+            return response
+        request.user = auth[0]
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+@csrf_exempt
+@require_POST
+@jwt_required
+async def upload_image(request):
+    image = request.FILES.get("image")
+    if not image:
+        return JsonResponse({"error": "No image uploaded"}, status=400)
+
+    try:
+        result = await get_service().apredict(image, timeout=settings.INFERENCE_TIMEOUT)
+    except InvalidImage as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    except asyncio.TimeoutError:
+        return JsonResponse({"error": "Food detection timed out, please retry."}, status=504)
+    except InferenceUnavailable:
+        return JsonResponse({"error": "Food detection is unavailable, please retry."}, status=503)
+    return JsonResponse(result)
+
+
+@require_GET
+@jwt_required
+async def get_records(request):
+    start_date = records_start(request.GET.get("tab", "daily"), date.today())
+    cursor = request.GET.get("cursor")
+    try:
+        limit = min(max(int(request.GET.get("limit", settings.RECORDS_PAGE_SIZE)), 1), 1000)
+    except ValueError:
+        return JsonResponse({"error": "limit must be an integer"}, status=400)
+
+    version = await rollups.aversion(request.user, start_date)
+    headers, not_modified = records_validators(request, (start_date, cursor, limit), version)
+    if not_modified is not None:
+        return not_modified
+
+    try:
+        rows, next_cursor = await apage_records(request.user, start_date, cursor, limit)
+    except RecordError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return JsonResponse(rows, safe=False, headers=headers)
+
+
+@require_GET
+@jwt_required
+async def calorie_summary(request):
+    return JsonResponse(await rollups.asummary(request.user, date.today()))
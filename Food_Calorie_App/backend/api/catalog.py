@@ -0,0 +1,92 @@
+"""In-process cache of the FoodItem nutrition table.
+
+The few hundred FoodItem rows are loaded once into a dictionary keyed by the
+case-folded name, so saving meals and food search cost no queries. Saves and
+deletes of FoodItems (including through the admin) drop the cache via
+post_save/post_delete signals and it is reloaded on next use. Other server
+processes pick changes up after CATALOG_TTL seconds. `bulk_create`, `update`
+and raw SQL send no signals; call `catalog.invalidate()` after using them.
+"""
+import bisect
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .models import FoodItem
+
+
+class Catalog:
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self._state = None  # (casefolded name -> FoodItem, sorted casefolded names, load time)
+        self._lock = threading.Lock()
+
+    def _load(self):
+        foods = {}
+        for food in FoodItem.objects.order_by("id"):
+            foods.setdefault(food.name.casefold(), food)
+        return foods, sorted(foods), time.monotonic()
+
+    def _current(self):
+        state = self._state
+        if state is None or (self.ttl is not None and time.monotonic() - state[2] > self.ttl):
+            with self._lock:
+                if self._state is state:
+                    self._state = self._load()
+                state = self._state
+        return state
+
+    def foods(self):
+        """The casefolded name -> FoodItem dictionary, (re)loaded if needed."""
+        return self._current()[0]
+
+    def get(self, name):
+        return self.foods().get(name.strip().casefold())
+
+    def lookup(self, names):
+        """Map each known name (as given) to its FoodItem."""
+        foods = self.foods()
+        found = {}
+        for name in names:
+            food = foods.get(name.strip().casefold())
+            if food is not None:
+                found[name] = food
+        return found
+
+    def search(self, query, limit=10):
+        """Foods whose name starts with `query`, then those containing it, alphabetically."""
+        foods, keys, _ = self._current()
+        query = query.strip().casefold()
+        start = bisect.bisect_left(keys, query)
+        matches = []
+        for key in keys[start:start + limit]:
+            if not key.startswith(query):
+                break
+            matches.append(key)
+        if len(matches) < limit:
+            prefixed = set(matches)
+            for key in keys:
+                if query in key and key not in prefixed:
+                    matches.append(key)
+                    if len(matches) >= limit:
+                        break
+        return [foods[k] for k in matches]
+
+    def invalidate(self, **kwargs):
+        self._state = None
+        # Also drop anything another thread loaded before the change was committed.
+        transaction.on_commit(self._clear)
+
+    def _clear(self):
+        self._state = None
+
+
+catalog = Catalog(ttl=settings.CATALOG_TTL)
+
+
+def connect_signals():
+    post_save.connect(catalog.invalidate, sender=FoodItem, dispatch_uid="catalog-save")
+    post_delete.connect(catalog.invalidate, sender=FoodItem, dispatch_uid="catalog-delete")
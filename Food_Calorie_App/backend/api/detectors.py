@@ -0,0 +1,117 @@
+"""Pluggable food detector backends.
+
+`ultralytics` runs `best.pt` through PyTorch, as the app always has. `onnx`
+runs the model exported by `python manage.py export_detector` (optionally
+INT8-quantized) on ONNX Runtime, which is usually much faster on CPU-only
+hosts. Both take BGR uint8 arrays and return the sorted class names detected
+in each image.
+
+Set FOOD_DETECTOR=onnx (and FOOD_ONNX_PATH if the model is not `best.onnx`)
+to switch; `python manage.py benchmark_detectors` compares latency and
+detected classes across backends on a folder of photos.
+"""
+import ast
+
+import numpy as np
+from PIL import Image
+
+
+DEFAULT_CONF = 0.25  # ultralytics' default confidence threshold
+
+
+class UltralyticsDetector:
+    name = "ultralytics"
+
+    def __init__(self, model_path, imgsz=640, threads=0, conf=DEFAULT_CONF):
+        from ultralytics import YOLO
+
+        if threads:
+            import torch
+
+            torch.set_num_threads(threads)
+        self.model = YOLO(str(model_path))
+        self.imgsz = imgsz
+        self.conf = conf
+
+    def detect(self, images):
+        results = self.model.predict(images, imgsz=self.imgsz, conf=self.conf, verbose=False)
+        detections = []
+        for result in results:
+            names = set()
+            if result.boxes is not None:
+                names.update(result.names[int(cls_idx)] for cls_idx in result.boxes.cls)
+            detections.append(sorted(names))
+        return detections
+
+
+def letterbox(image, size):
+    """Fit a BGR array into a size x size gray canvas as ultralytics does; returns RGB float32 CHW in [0, 1]."""
+    h, w = image.shape[:2]
+    scale = min(size / h, size / w)
+    nh, nw = round(h * scale), round(w * scale)
+    rgb = Image.fromarray(np.ascontiguousarray(image[:, :, ::-1]))
+    if (nw, nh) != (w, h):
+        rgb = rgb.resize((nw, nh), Image.Resampling.BILINEAR)
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    top, left = (size - nh) // 2, (size - nw) // 2
+    canvas[top:top + nh, left:left + nw] = np.asarray(rgb)
+    return canvas.transpose(2, 0, 1).astype(np.float32) / 255.0
+
+
+class OnnxDetector:
+    """A YOLOv8 detection model exported to ONNX by ultralytics.
+
+    Only class names are needed, so boxes are not decoded and no NMS is run:
+    ultralytics' class-aware NMS keeps at least the best box of every class
+    whose score clears `conf`, so the detected set is the same.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_path, imgsz=640, threads=0, conf=DEFAULT_CONF):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # [batch, 3, height, width]; dynamic axes are strings.
+        batch, _, height, _ = model_input.shape
+        self.imgsz = height if isinstance(height, int) else imgsz
+        self.batched = not isinstance(batch, int)
+        names = ast.literal_eval(self.session.get_modelmeta().custom_metadata_map["names"])
+        self.names = [names[i] for i in range(len(names))]
+        self.conf = conf
+
+    def detect(self, images):
+        batch = np.stack([letterbox(image, self.imgsz) for image in images])
+        if self.batched:
+            output = self.session.run(None, {self.input_name: batch})[0]
+        else:
+            output = np.concatenate([self.session.run(None, {self.input_name: x[None]})[0] for x in batch])
+        # (batch, 4 box + classes [+ mask coefficients], anchors)
+        scores = output[:, 4:4 + len(self.names), :]
+        best = scores.argmax(axis=1)
+        found = scores.max(axis=1) > self.conf
+        return [sorted({self.names[c] for c in best[i][found[i]]}) for i in range(len(images))]
+
+
+DETECTORS = {
+    UltralyticsDetector.name: UltralyticsDetector,
+    OnnxDetector.name: OnnxDetector,
+}
+
+
+def build_detector(name, model_path, imgsz=640, threads=0):
+    if name not in DETECTORS:
+        raise ValueError(f"Unknown food detector {name!r}; choose from {', '.join(DETECTORS)}")
+    return DETECTORS[name](model_path, imgsz=imgsz, threads=threads)
+
+
+def detector_path(settings):
+    """The weights file the configured FOOD_DETECTOR loads."""
+    return settings.FOOD_ONNX_PATH if settings.FOOD_DETECTOR == OnnxDetector.name else settings.FOOD_MODEL_PATH
@@ -0,0 +1,334 @@
+"""Background YOLO inference for food uploads.
+
+A pool of worker processes each holds its own lazily loaded detector
+(`registry.ModelRegistry`, backends in `detectors.py`). Uploads are queued to an in-process dispatcher
+that gathers requests arriving within a short window into one batched
+`predict` call, so concurrent meal uploads share the model instead of each
+tying up a request thread for a full inference.
+
+Uploads are handed to the workers as bytes and decoded in memory there
+(`imaging.decode_image`); nothing is written to disk. Results are also
+written to the "jobs" cache under the job id; that cache is shared by all
+server processes (file-based by default), so a poll can land on any worker. Detections are
+cached by a hash of the image bytes plus the weights version, so re-uploads
+of the same photo skip inference entirely.
+
+If a worker process dies the pool is replaced and the jobs it was running
+are resubmitted; detections that still fail raise `InferenceUnavailable`,
+which the views turn into a 503.
+"""
+import asyncio
+import hashlib
+import multiprocessing
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+from .detectors import detector_path
+from .imaging import InvalidImage, decode_image, read_upload
+from .registry import ModelRegistry
+
+
+JOB_TTL = 10 * 60
+JOB_CACHE = "jobs"
+DETECTION_CACHE = "detections"
+BROKEN_POOL_RETRIES = 2  # resubmissions after a worker dies; the crash may have been another job's fault
+
+_registry = None
+
+
+class InferenceUnavailable(Exception):
+    """Detection failed in the worker pool or model rather than because of the image."""
+
+
+def _init_worker(model_path, imgsz, warm_up, detector="ultralytics", threads=0):
+    global _registry
+    _registry = ModelRegistry(model_path, imgsz, detector, threads)
+    if warm_up:
+        _registry.warm_up()
+
+
+def _worker_timings():
+    return dict(_registry.timings, loaded=_registry.loaded)
+
+
+def _predict_batch(images):
+    """Decode and run one batched predict over encoded images.
+
+    Returns (outputs, worker timings), with one output dict per image:
+    {"detected_items", "timings"}, or {"error"} if the image could not be
+    decoded (the rest of the batch still runs).
+    """
+    outputs = [None] * len(images)
+    arrays, positions = [], []
+    for i, data in enumerate(images):
+        try:
+            array, timings = decode_image(data, _registry.imgsz)
+        except InvalidImage as e:
+            outputs[i] = {"error": str(e)}
+            continue
+        arrays.append(array)
+        positions.append(i)
+        outputs[i] = {"timings": timings}
+
+    if arrays:
+        started = time.perf_counter()
+        detections = _registry.get().detect(arrays)
+        inference_ms = round((time.perf_counter() - started) * 1000, 2)
+        for i, names in zip(positions, detections):
+            outputs[i]["detected_items"] = names
+            outputs[i]["timings"].update(inference_ms=inference_ms, batch_size=len(arrays))
+    return outputs, _worker_timings()
+
+
+def weights_version(model_path):
+    """Short content hash of the weights file, so a retrained model invalidates cached detections."""
+    digest = hashlib.sha256()
+    try:
+        with open(model_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+    except FileNotFoundError:
+        # No weights to hash yet: key on the configured path so two missing models never share detections.
+        return "missing-" + hashlib.sha256(str(model_path).encode()).hexdigest()[:8]
+    return digest.hexdigest()[:16]
+
+
+class InferenceService:
+    """Queue uploads, batch them and run them on a process pool."""
+
+    def __init__(self, model_path, workers=1, max_batch=8, batch_window=0.01, imgsz=640, warm_up=False,
+                 detector="ultralytics", threads=0):
+        self.workers = workers
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.imgsz = imgsz
+        self.detector = detector
+        self.weights_version = weights_version(model_path)
+        # Backends may differ slightly, so each caches its own detections.
+        self.cache_prefix = f"{detector}:{self.weights_version}:{imgsz}"
+        self.worker_timings = {}
+        self._queue = queue.Queue()
+        self._waiters = {}  # image key -> [(job_id, future)], so duplicate uploads in flight run once
+        self._lock = threading.Lock()
+        self._pool_args = (str(model_path), imgsz, warm_up, detector, threads)
+        self._pool = self._new_pool()
+        self._thread = threading.Thread(target=self._dispatch, name="inference-dispatcher", daemon=True)
+        self._thread.start()
+
+    def _new_pool(self):
+        # spawn: forking a threaded Django process that may hold torch state is unsafe.
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=self._pool_args,
+        )
+
+    def _replace_pool(self, broken):
+        """Swap in a fresh pool once a worker has died; a broken ProcessPoolExecutor never recovers."""
+        with self._lock:
+            if self._pool is broken:
+                self._pool = self._new_pool()
+                self.worker_timings = {}
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _register(self, image):
+        """Create a job for an upload: (job_id, future, key, data), with data None if no run is needed.
+
+        Cached images resolve at once and duplicates of an image already in flight
+        wait on it, so only the first upload of new bytes returns its data to run.
+        """
+        data = read_upload(image)
+        job_id = uuid.uuid4().hex
+        future = Future()
+        key = f"{self.cache_prefix}:{hashlib.sha256(data).hexdigest()}"
+        cached = caches[DETECTION_CACHE].get(key)
+        if cached is not None:
+            # No timings: nothing was decoded or inferred for this upload.
+            output = {"detected_items": cached["detected_items"], "cached": True}
+            caches[JOB_CACHE].set(f"inference:{job_id}", {"status": "done", **output}, JOB_TTL)
+            future.set_result(output)
+            return job_id, future, key, None
+
+        caches[JOB_CACHE].set(f"inference:{job_id}", {"status": "pending"}, JOB_TTL)
+        with self._lock:
+            waiting = key in self._waiters
+            self._waiters.setdefault(key, []).append((job_id, future))
+        return job_id, future, key, None if waiting else data
+
+    def _enqueue(self, image):
+        job_id, future, key, data = self._register(image)
+        if data is not None:
+            self._queue.put((key, data))
+        return job_id, future
+
+    def submit(self, image):
+        """Queue an uploaded file for detection and return its job id (see `job_status`)."""
+        return self._enqueue(image)[0]
+
+    def predict(self, image, timeout=None):
+        """Queue an uploaded file and block until its {"detected_items", "timings"} are ready."""
+        return self._enqueue(image)[1].result(timeout)
+
+    def predict_many(self, images, timeout=None):
+        """Detect several uploads with one batched `predict` and return their results in order.
+
+        Bypasses the dispatcher so the images are not split across batches.
+        Each result is {"detected_items", "timings", "cached"} or, for an image
+        that could not be decoded, {"error"}.
+        """
+        jobs = [self._register(image) for image in images]
+        batch = [(key, data) for _, _, key, data in jobs if data is not None]
+        if batch:
+            self._run(batch)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        results = []
+        for _, future, _, _ in jobs:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                results.append(future.result(remaining))
+            except InvalidImage as e:  # InferenceUnavailable fails the whole request
+                results.append({"error": str(e)})
+        return results
+
+    async def apredict(self, image, timeout=None):
+        """`predict` for async views: the event loop stays free while the image is hashed and detected."""
+        _, future = await sync_to_async(self._enqueue, thread_sensitive=False)(image)
+        # shield: a timed-out request must not cancel the future that other duplicate uploads share.
+        return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+
+    def warm_up(self, timeout=None):
+        """Start every worker process and wait until each has loaded (and, if enabled, warmed) the model."""
+        futures = [self._pool.submit(_worker_timings) for _ in range(self.workers)]
+        for future in futures:
+            self._record(future.result(timeout))
+        return self.stats()
+
+    def stats(self):
+        return {
+            "detector": self.detector,
+            "weights_version": self.weights_version,
+            "imgsz": self.imgsz,
+            "workers": sorted(self.worker_timings.values(), key=lambda t: t["pid"]),
+        }
+
+    def _record(self, timings):
+        self.worker_timings[timings["pid"]] = timings
+
+    def _dispatch(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._run(batch)
+
+    def _run(self, batch, retries=BROKEN_POOL_RETRIES):
+        images = [data for _, data in batch]
+        pool = self._pool
+        try:
+            running = pool.submit(_predict_batch, images)
+        except BrokenProcessPool as e:
+            self._replace_pool(pool)
+            self._retry(batch, retries, e)
+            return
+        except Exception as e:
+            self._fail(batch, e)
+            return
+        running.add_done_callback(lambda done: self._finish(batch, done, pool, retries))
+
+    def _finish(self, batch, done, pool, retries):
+        try:
+            detected, timings = done.result()
+        except BrokenProcessPool as e:
+            # A worker died (crash, OOM kill) and took every job in flight on this pool with it.
+            self._replace_pool(pool)
+            self._retry(batch, retries, e)
+            return
+        except Exception as e:
+            if len(batch) > 1:
+                # Retry one by one so a single failing image does not fail the whole batch.
+                for item in batch:
+                    self._run([item], retries)
+            else:
+                self._fail(batch, e)
+            return
+
+        self._record(timings)
+        for (key, _), output in zip(batch, detected):
+            if "error" in output:
+                self._resolve(key, {"status": "failed", **output}, error=InvalidImage(output["error"]))
+            else:
+                caches[DETECTION_CACHE].set(key, {"detected_items": output["detected_items"]})
+                self._resolve(key, {"status": "done", **output, "cached": False})
+
+    def _retry(self, batch, retries, error):
+        if retries <= 0:
+            self._fail(batch, error)
+        elif len(batch) > 1:
+            # One by one, so if an image is what kills the worker only that image ends up failing.
+            for item in batch:
+                self._run([item], retries)
+        else:
+            self._run(batch, retries - 1)
+
+    def _fail(self, batch, error):
+        message = str(error) or type(error).__name__
+        for key, _ in batch:
+            self._resolve(key, {"status": "failed", "error": message}, error=InferenceUnavailable(message))
+
+    def _resolve(self, key, status, error=None):
+        with self._lock:
+            waiters = self._waiters.pop(key, [])
+        for job_id, future in waiters:
+            caches[JOB_CACHE].set(f"inference:{job_id}", status, JOB_TTL)
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result({k: v for k, v in status.items() if k != "status"})
+
+
+def job_status(job_id):
+    """Return the cached {"status": ...} payload of a job, or None if unknown or expired."""
+    return caches[JOB_CACHE].get(f"inference:{job_id}")
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_service():
+    """The process-wide InferenceService, started on first use."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = InferenceService(
+                detector_path(settings),
+                workers=settings.INFERENCE_WORKERS,
+                max_batch=settings.INFERENCE_MAX_BATCH,
+                batch_window=settings.INFERENCE_BATCH_WINDOW_MS / 1000,
+                imgsz=settings.INFERENCE_IMGSZ,
+                warm_up=settings.INFERENCE_WARMUP,
+                detector=settings.FOOD_DETECTOR,
+                threads=settings.INFERENCE_THREADS,
+            )
+        return _service
+
+
+def current_service():
+    """The InferenceService if one has been started in this process, else None."""
+    return _service
@@ -0,0 +1,19 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from api.rollups import backfill
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-user daily calorie totals from all saved CalorieRecords."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", action="append", dest="usernames",
+                            help="only rebuild this username (repeatable)")
+
+    def handle(self, *args, **options):
+        users = None
+        if options["usernames"]:
+            users = User.objects.filter(username__in=options["usernames"])
+        rows = backfill(users)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {rows} daily totals."))
@@ -0,0 +1,77 @@
+import statistics
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.detectors import build_detector
+from api.imaging import InvalidImage, decode_image
+
+from .export_detector import image_paths
+
+
+class Command(BaseCommand):
+    help = ("Compare detector backends on a folder of photos: per-image latency, batched throughput "
+            "and how often each backend detects the same classes as the first one.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--images", required=True, help="folder of food photos")
+        parser.add_argument("--limit", type=int, help="use at most this many photos")
+        parser.add_argument("--onnx", action="append", default=[],
+                            help="ONNX model to include (repeatable; default FOOD_ONNX_PATH if it exists)")
+        parser.add_argument("--skip-pytorch", action="store_true", help="leave out the ultralytics backend")
+        parser.add_argument("--imgsz", type=int, default=settings.INFERENCE_IMGSZ)
+        parser.add_argument("--threads", type=int, default=settings.INFERENCE_THREADS)
+        parser.add_argument("--batch", type=int, default=settings.INFERENCE_MAX_BATCH, help="batch size for throughput")
+        parser.add_argument("--runs", type=int, default=3, help="timed passes over the photos")
+
+    def handle(self, *args, **options):
+        arrays = []
+        for path in image_paths(options["images"], options["limit"]):
+            try:
+                arrays.append(decode_image(path.read_bytes(), options["imgsz"])[0])
+            except InvalidImage:
+                self.stderr.write(f"Skipping unreadable {path.name}")
+        if not arrays:
+            raise CommandError(f"No readable photos in {options['images']}")
+
+        backends = [] if options["skip_pytorch"] else [("ultralytics", "ultralytics", settings.FOOD_MODEL_PATH)]
+        onnx_paths = options["onnx"] or ([settings.FOOD_ONNX_PATH] if Path(settings.FOOD_ONNX_PATH).exists() else [])
+        backends += [(f"onnx:{Path(p).name}", "onnx", p) for p in onnx_paths]
+        if not backends:
+            raise CommandError("Nothing to benchmark; pass --onnx or drop --skip-pytorch")
+
+        self.stdout.write(f"{len(arrays)} photos, imgsz {options['imgsz']}, threads {options['threads'] or 'default'}")
+        self.stdout.write(f"{'backend':<28}{'load ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'img/s @batch':>14}{'same classes':>14}")
+        reference = None
+        for label, name, path in backends:
+            started = time.perf_counter()
+            detector = build_detector(name, path, options["imgsz"], options["threads"])
+            load_ms = (time.perf_counter() - started) * 1000
+            detector.detect(arrays[:1])  # warm-up
+
+            latencies, detections = [], []
+            for run in range(options["runs"]):
+                for array in arrays:
+                    started = time.perf_counter()
+                    found = detector.detect([array])[0]
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    if run == 0:
+                        detections.append(found)
+            latencies.sort()
+
+            started = time.perf_counter()
+            for i in range(0, len(arrays), options["batch"]):
+                detector.detect(arrays[i:i + options["batch"]])
+            throughput = len(arrays) / (time.perf_counter() - started)
+
+            if reference is None:
+                reference, parity = detections, "reference"
+            else:
+                same = sum(a == b for a, b in zip(reference, detections))
+                parity = f"{same / len(arrays):.1%}"
+            self.stdout.write(
+                f"{label:<28}{load_ms:>9.0f}{statistics.median(latencies):>9.1f}"
+                f"{latencies[max(int(len(latencies) * 0.95) - 1, 0)]:>9.1f}{throughput:>14.1f}{parity:>14}"
+            )
@@ -0,0 +1,106 @@
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.detectors import letterbox
+from api.imaging import InvalidImage, decode_image
+
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+
+
+def image_paths(folder, limit=None):
+    paths = sorted(p for p in Path(folder).iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+    return paths[:limit] if limit else paths
+
+
+def quantize(source, target, calibration=None, limit=100):
+    """Write an INT8 copy of an ONNX model.
+
+    With a folder of calibration photos, weights and activations are quantized
+    statically (QDQ), which is what speeds up a convolutional detector on CPU;
+    without one only weights are quantized, dynamically.
+    """
+    import onnx
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Fold constants and infer shapes first, as ONNX Runtime recommends before quantizing.
+        prepared = Path(tmp) / "prepared.onnx"
+        quant_pre_process(str(source), str(prepared))
+        _quantize(prepared, target, calibration, limit)
+
+    # Keep the class names (and other export metadata) the detector reads.
+    original, quantized = onnx.load(str(source)), onnx.load(str(target))
+    del quantized.metadata_props[:]
+    quantized.metadata_props.extend(original.metadata_props)
+    onnx.save(quantized, str(target))
+
+
+def _quantize(source, target, calibration, limit):
+    import onnxruntime as ort
+    from onnxruntime.quantization import (
+        CalibrationDataReader, QuantFormat, QuantType, quantize_dynamic, quantize_static,
+    )
+
+    if calibration is None:
+        quantize_dynamic(str(source), str(target), weight_type=QuantType.QUInt8)
+        return
+
+    model_input = ort.InferenceSession(str(source), providers=["CPUExecutionProvider"]).get_inputs()[0]
+    height = model_input.shape[2]
+    imgsz = height if isinstance(height, int) else settings.INFERENCE_IMGSZ
+
+    class Photos(CalibrationDataReader):
+        def __init__(self):
+            self.paths = iter(image_paths(calibration, limit))
+
+        def get_next(self):
+            for path in self.paths:
+                try:
+                    array, _ = decode_image(path.read_bytes(), imgsz)
+                except InvalidImage:
+                    continue
+                return {model_input.name: letterbox(array, imgsz)[None]}
+            return None
+
+    quantize_static(str(source), str(target), Photos(), quant_format=QuantFormat.QDQ,
+                    per_channel=True, activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+
+
+class Command(BaseCommand):
+    help = "Export best.pt to ONNX for FOOD_DETECTOR=onnx, optionally quantized to INT8."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--imgsz", type=int, default=settings.INFERENCE_IMGSZ, help="model input size")
+        parser.add_argument("--output", default=settings.FOOD_ONNX_PATH, help="where to write the ONNX model")
+        parser.add_argument("--int8", action="store_true", help="quantize the exported model to INT8")
+        parser.add_argument("--calibration", help="folder of food photos for static INT8 calibration")
+        parser.add_argument("--calibration-images", type=int, default=100, help="photos to calibrate on")
+
+    def handle(self, *args, **options):
+        from ultralytics import YOLO
+
+        if options["calibration"] and not options["int8"]:
+            raise CommandError("--calibration only applies with --int8")
+        output = Path(options["output"])
+        # Dynamic axes let the worker pool run batches of any size.
+        exported = Path(YOLO(str(settings.FOOD_MODEL_PATH)).export(
+            format="onnx", imgsz=options["imgsz"], dynamic=True, simplify=True))
+
+        if options["int8"]:
+            partial = output.with_name(output.stem + ".partial.onnx")
+            quantize(exported, partial, options["calibration"], options["calibration_images"])
+            os.replace(partial, output)
+            kind = "INT8 (static)" if options["calibration"] else "INT8 (dynamic)"
+        else:
+            if exported.resolve() != output.resolve():
+                os.replace(exported, output)
+            kind = "FP32"
+
+        size_mb = output.stat().st_size / 1e6
+        self.stdout.write(self.style.SUCCESS(f"Wrote {kind} ONNX model to {output} ({size_mb:.1f} MB)."))
+        self.stdout.write(f"Serve it with FOOD_DETECTOR=onnx FOOD_ONNX_PATH={output}")
@@ -0,0 +1,82 @@
+import mimetypes
+import statistics
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def multipart(field, data, content_type):
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="upload"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode() + data + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+class Command(BaseCommand):
+    help = ("Fire concurrent requests at a running server and report throughput and latency, "
+            "e.g. to compare a WSGI deployment with the async endpoints under uvicorn.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("url", help="full endpoint URL, e.g. http://127.0.0.1:8000/api/async/summary/")
+        parser.add_argument("--token", help="JWT access token sent as a Bearer header")
+        parser.add_argument("--image", help="POST this file as the 'image' field instead of a GET")
+        parser.add_argument("--unique", action="store_true",
+                            help="append random bytes to each upload so the detection cache never hits")
+        parser.add_argument("--requests", type=int, default=500, help="total requests")
+        parser.add_argument("--concurrency", type=int, default=50, help="requests in flight at once")
+        parser.add_argument("--timeout", type=float, default=60)
+
+    def handle(self, *args, **options):
+        headers = {}
+        if options["token"]:
+            headers["Authorization"] = f"Bearer {options['token']}"
+        image = None
+        if options["image"]:
+            try:
+                with open(options["image"], "rb") as f:
+                    image = f.read()
+            except OSError as e:
+                raise CommandError(str(e))
+            image_type = mimetypes.guess_type(options["image"])[0] or "application/octet-stream"
+
+        def one(_):
+            request_headers = dict(headers)
+            body = None
+            if image is not None:
+                # Image decoders ignore bytes after the end of the image.
+                data = image + uuid.uuid4().bytes if options["unique"] else image
+                body, request_headers["Content-Type"] = multipart("image", data, image_type)
+            request = urllib.request.Request(options["url"], data=body, headers=request_headers)
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=options["timeout"]) as response:
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as e:
+                status = e.code
+            except (urllib.error.URLError, OSError) as e:
+                status = type(e).__name__
+            return status, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            results = list(pool.map(one, range(options["requests"])))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency * 1000 for _, latency in results)
+        statuses = Counter(status for status, _ in results)
+        self.stdout.write(f"Requests:     {len(results)} at concurrency {options['concurrency']}")
+        self.stdout.write(f"Statuses:     {dict(statuses)}")
+        self.stdout.write(f"Elapsed:      {elapsed:.2f}s ({len(results) / elapsed:.1f} req/s)")
+        self.stdout.write(
+            f"Latency (ms): p50 {statistics.median(latencies):.1f}  "
+            f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.1f}  max {latencies[-1]:.1f}"
+        )
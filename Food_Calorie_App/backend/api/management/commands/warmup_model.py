@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.detectors import detector_path
+from api.registry import ModelRegistry
+
+
+class Command(BaseCommand):
+    help = "Load the YOLO weights and run dummy inferences, reporting load and warm-up timings."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=1, help="number of dummy inferences")
+
+    def handle(self, *args, **options):
+        registry = ModelRegistry(detector_path(settings), settings.INFERENCE_IMGSZ,
+                                 settings.FOOD_DETECTOR, settings.INFERENCE_THREADS)
+        for run in range(options["runs"]):
+            timings = registry.warm_up()
+            if run == 0:
+                self.stdout.write(f"Loaded {registry.model_path} in {timings['load_ms']} ms")
+            self.stdout.write(f"Warm-up inference {run + 1}: {timings['warmup_ms']} ms")
+        self.stdout.write(self.style.SUCCESS("Model ready."))
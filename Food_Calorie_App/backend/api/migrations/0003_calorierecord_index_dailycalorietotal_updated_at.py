@@ -0,0 +1,22 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_dailycalorietotal'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='calorierecord',
+            index=models.Index(fields=['user', 'date', 'id'], name='calorierecord_user_date_id'),
+        ),
+        migrations.AddField(
+            model_name='dailycalorietotal',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -16,6 +16,12 @@ class CalorieRecord(models.Model):
     total_calories = models.FloatField()
     date = models.DateField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Serves the per-user date filters and the (date, id) keyset pagination of /records/.
+            models.Index(fields=["user", "date", "id"], name="calorierecord_user_date_id"),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.food_item}"
 
@@ -25,4 +31,20 @@ class FoodItem(models.Model):
     calories_per_100g = models.FloatField()
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+class DailyCalorieTotal(models.Model):
+    """Per-user calorie total for one day, kept in step with CalorieRecord by api/rollups.py."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    date = models.DateField()
+    total_calories = models.FloatField(default=0)
+    record_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "date"], name="unique_daily_total_per_user"),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.date}: {self.total_calories}"
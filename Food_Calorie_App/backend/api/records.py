@@ -0,0 +1,139 @@
+"""Saving and listing a user's CalorieRecords.
+
+Food names are resolved case-insensitively against the in-memory catalog
+(`catalog.py`), without queries, and every record is inserted with
+`bulk_create` in a single transaction, so a meal is saved completely or not at
+all, whatever its size. The daily totals (`rollups.py`) are updated in the
+same transaction: directly for bulk inserts, which send no signals, and by
+rollups' signal handlers for deletes. Listings are paged by (date, id) keyset and read as plain
+dicts with `.values()`.
+"""
+import math
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Q
+
+from . import rollups
+from .catalog import catalog
+from .models import CalorieRecord
+
+
+BULK_BATCH_SIZE = 500
+
+
+class RecordError(ValueError):
+    pass
+
+
+def _parse_item(item):
+    if not isinstance(item, dict):
+        raise RecordError("Every item must be an object with a 'food_item' name.")
+    name = item.get("food_item")
+    if not isinstance(name, str) or not name.strip():
+        raise RecordError("Every item needs a 'food_item' name.")
+    try:
+        servings = float(item.get("servings", 1))
+        weight_in_grams = float(item.get("weight_in_grams", 100))
+    except (TypeError, ValueError):
+        raise RecordError(f"Invalid servings or weight for '{name}'.")
+    # NaN or infinite values would fail the insert or poison the daily totals.
+    if not all(math.isfinite(v) and v > 0 for v in (servings, weight_in_grams)):
+        raise RecordError(f"Servings and weight for '{name}' must be positive numbers.")
+    return name.strip(), servings, weight_in_grams
+
+
+def save_meals(user, meals):
+    """Validate and save a list of meals (each a list of item dicts).
+
+    Returns the saved items per meal, in the shape the API responds with.
+    Raises RecordError, saving nothing, if any item is invalid or unknown.
+    """
+    if not isinstance(meals, list) or not all(isinstance(items, list) for items in meals):
+        raise RecordError("Expected a list of meals, each a list of items.")
+    parsed = [[_parse_item(item) for item in items] for items in meals]
+    foods = catalog.lookup(name for items in parsed for name, _, _ in items)
+    missing = sorted({name for items in parsed for name, _, _ in items if name not in foods})
+    if missing:
+        raise RecordError(f"Food item '{missing[0]}' not found in database" if len(missing) == 1
+                          else f"Food items not found in database: {', '.join(missing)}")
+
+    records, saved = [], []
+    for items in parsed:
+        saved_items = []
+        for name, servings, weight_in_grams in items:
+            food = foods[name]
+            total_calories = (food.calories_per_100g * weight_in_grams / 100) * servings
+            records.append(CalorieRecord(
+                user=user,
+                food_item=food.name,
+                servings=servings,
+                weight_in_grams=weight_in_grams,
+                total_calories=total_calories,
+            ))
+            saved_items.append({
+                "food_item": food.name,
+                "servings": servings,
+                "weight_in_grams": weight_in_grams,
+                "total_calories": total_calories,
+            })
+        saved.append(saved_items)
+
+    with transaction.atomic():
+        CalorieRecord.objects.bulk_create(records, batch_size=BULK_BATCH_SIZE)
+        rollups.apply(records)
+    return saved
+
+
+def delete_user_record(user, record_id):
+    """Delete one of the user's records and take it off its daily total. Returns whether it existed."""
+    with transaction.atomic():
+        record = CalorieRecord.objects.select_for_update().filter(id=record_id, user=user).first()
+        if record is None:
+            return False
+        record.delete()  # rollups' post_delete handler takes it off the daily total
+    return True
+
+
+RECORD_FIELDS = ("id", "food_item", "servings", "weight_in_grams", "total_calories", "date")
+
+
+def encode_cursor(row):
+    return f"{row['date'].isoformat()}_{row['id']}"
+
+
+def decode_cursor(cursor):
+    try:
+        day, record_id = cursor.split("_")
+        return date.fromisoformat(day), int(record_id)
+    except ValueError:
+        raise RecordError("Invalid cursor.")
+
+
+def _page_query(user, start, cursor, limit):
+    rows = CalorieRecord.objects.filter(user=user)
+    if start is not None:
+        rows = rows.filter(date__gte=start)
+    if cursor:
+        day, record_id = decode_cursor(cursor)
+        rows = rows.filter(Q(date__gt=day) | Q(date=day, id__gt=record_id))
+    return rows.order_by("date", "id").values(*RECORD_FIELDS)[:limit + 1]
+
+
+def _split_page(rows, limit):
+    if len(rows) > limit:
+        return rows[:limit], encode_cursor(rows[limit - 1])
+    return rows, None
+
+
+def page_records(user, start=None, cursor=None, limit=100):
+    """One page of the user's records ordered by (date, id), as dicts.
+
+    Returns (rows, next cursor or None). Pages are keyed on the last (date, id)
+    seen rather than an offset, so each page is one index range scan.
+    """
+    return _split_page(list(_page_query(user, start, cursor, limit)), limit)
+
+
+async def apage_records(user, start=None, cursor=None, limit=100):
+    return _split_page([row async for row in _page_query(user, start, cursor, limit)], limit)
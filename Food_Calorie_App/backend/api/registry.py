@@ -0,0 +1,46 @@
+"""Lazily loaded food detector with an explicit warm-up hook.
+
+Nothing is imported or loaded until the model is first needed, so Django
+processes that never run inference (migrations, shell, tests, the web process
+itself) start without touching ultralytics, ONNX Runtime or the weights.
+"""
+import os
+import threading
+import time
+
+import numpy as np
+
+from .detectors import build_detector
+
+
+class ModelRegistry:
+    def __init__(self, model_path, imgsz=640, detector="ultralytics", threads=0):
+        self.model_path = str(model_path)
+        self.imgsz = imgsz
+        self.detector = detector
+        self.threads = threads
+        self._model = None
+        self._lock = threading.Lock()
+        self.timings = {"pid": os.getpid(), "load_ms": None, "warmup_ms": None}
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    def get(self):
+        """Return the detector, loading the weights on first call."""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    started = time.perf_counter()
+                    self._model = build_detector(self.detector, self.model_path, self.imgsz, self.threads)
+                    self.timings["load_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return self._model
+
+    def warm_up(self):
+        """Load the weights and run one dummy inference so the first real request is not slow."""
+        model = self.get()
+        started = time.perf_counter()
+        model.detect([np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8)])
+        self.timings["warmup_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return self.timings
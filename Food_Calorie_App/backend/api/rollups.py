@@ -0,0 +1,172 @@
+"""Per-user daily calorie totals (DailyCalorieTotal).
+
+Saving and deleting records adjusts the matching day's row in the same
+transaction, so summaries and trends aggregate a few hundred daily rows with
+one indexed query instead of summing every CalorieRecord in Python.
+
+`save_meals` applies its bulk insert directly; every other ORM save or delete
+of a CalorieRecord (admin, shell, `QuerySet.delete()`) is applied by the
+signal handlers below. `bulk_create`, `bulk_update`, `QuerySet.update()` and
+raw SQL send no signals, so run `python manage.py backfill_daily_totals`
+after using them, once for records saved before the rollup existed, or
+whenever the two may have drifted.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.db.models.functions import Coalesce, TruncMonth, TruncWeek
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+
+from .models import CalorieRecord, DailyCalorieTotal
+
+
+TREND_GROUPS = {"day": None, "week": TruncWeek, "month": TruncMonth}
+
+
+def _adjust(user_id, day, calories, count):
+    rows = DailyCalorieTotal.objects.filter(user_id=user_id, date=day)
+    changes = {
+        "total_calories": F("total_calories") + calories,
+        "record_count": F("record_count") + count,
+        "updated_at": timezone.now(),
+    }
+    if rows.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            DailyCalorieTotal.objects.create(
+                user_id=user_id, date=day, total_calories=calories, record_count=count)
+    except IntegrityError:  # another request created the row first
+        rows.update(**changes)
+
+
+def apply(records, sign=1):
+    """Add (sign=1) or remove (sign=-1) saved records from their daily totals."""
+    deltas = defaultdict(lambda: [0.0, 0])
+    for record in records:
+        delta = deltas[record.user_id, record.date]
+        delta[0] += record.total_calories
+        delta[1] += 1
+    # Days emptied by deletes keep their (zero) row, so `updated_at` still records the change.
+    with transaction.atomic():
+        for (user_id, day), (calories, count) in sorted(deltas.items()):
+            _adjust(user_id, day, sign * calories, sign * count)
+
+
+def _version_query(user, start):
+    rows = DailyCalorieTotal.objects.filter(user=user)
+    if start is not None:
+        rows = rows.filter(date__gte=start)
+    return rows, {"count": Sum("record_count"), "changed": Max("updated_at")}
+
+
+def version(user, start=None):
+    """(records, last change) of the user's records from `start` on, from the rollup alone."""
+    rows, aggregates = _version_query(user, start)
+    totals = rows.aggregate(**aggregates)
+    return totals["count"] or 0, totals["changed"]
+
+
+async def aversion(user, start=None):
+    rows, aggregates = _version_query(user, start)
+    totals = await rows.aaggregate(**aggregates)
+    return totals["count"] or 0, totals["changed"]
+
+
+def _summary_query(user, today):
+    week_start = today - timedelta(days=today.weekday())
+    month_start = today.replace(day=1)
+    rows = DailyCalorieTotal.objects.filter(user=user, date__gte=min(week_start, month_start), date__lte=today)
+    return rows, {
+        "daily": Coalesce(Sum("total_calories", filter=Q(date=today)), 0.0),
+        "weekly": Coalesce(Sum("total_calories", filter=Q(date__gte=week_start)), 0.0),
+        "monthly": Coalesce(Sum("total_calories", filter=Q(date__gte=month_start)), 0.0),
+    }
+
+
+def summary(user, today):
+    """Calories for today, this week (from Monday) and this month, in one query."""
+    rows, aggregates = _summary_query(user, today)
+    return rows.aggregate(**aggregates)
+
+
+async def asummary(user, today):
+    rows, aggregates = _summary_query(user, today)
+    return await rows.aaggregate(**aggregates)
+
+
+def trend(user, start, end, group="day"):
+    """[{"date", "total_calories"}] per day, week or month between start and end, oldest first.
+
+    Periods without records are included with 0, so the result can be charted directly.
+    """
+    rows = DailyCalorieTotal.objects.filter(user=user, date__gte=start, date__lte=end)
+    if group == "day":
+        totals = dict(rows.values_list("date", "total_calories"))
+    else:
+        totals = dict(rows.annotate(period=TREND_GROUPS[group]("date")).values("period")
+                      .annotate(total=Sum("total_calories")).values_list("period", "total"))
+    periods = sorted({_period(start + timedelta(days=i), group) for i in range((end - start).days + 1)})
+    return [{"date": period, "total_calories": totals.get(period, 0.0)} for period in periods]
+
+
+def _period(day, group):
+    if group == "week":
+        return day - timedelta(days=day.weekday())
+    if group == "month":
+        return day.replace(day=1)
+    return day
+
+
+def backfill(users=None):
+    """Rebuild the daily totals of `users` (default: everyone) from CalorieRecord. Returns rows written."""
+    records = CalorieRecord.objects.all()
+    totals = DailyCalorieTotal.objects.all()
+    if users is not None:
+        records = records.filter(user__in=users)
+        totals = totals.filter(user__in=users)
+    rows = [
+        DailyCalorieTotal(user_id=row["user_id"], date=row["date"],
+                          total_calories=row["calories"], record_count=row["count"])
+        for row in records.values("user_id", "date").annotate(
+            calories=Sum("total_calories"), count=Count("id")).order_by()
+    ]
+    with transaction.atomic():
+        totals.delete()
+        DailyCalorieTotal.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def _before_save(sender, instance, raw=False, **kwargs):
+    # Remember what an edited record counted for, to move it off its old day and total.
+    instance._rollup_previous = None
+    if instance.pk is not None and not raw:
+        instance._rollup_previous = (
+            CalorieRecord.objects.filter(pk=instance.pk).only("user_id", "date", "total_calories").first())
+
+
+def _after_save(sender, instance, created, raw=False, **kwargs):
+    if raw:  # loaddata: run backfill_daily_totals afterwards
+        return
+    with transaction.atomic():
+        previous = getattr(instance, "_rollup_previous", None)
+        if previous is not None:
+            apply([previous], sign=-1)
+        apply([instance])
+
+
+def _after_delete(sender, instance, origin=None, **kwargs):
+    # Deleting users (an instance or a queryset) cascades to their daily totals too: nothing to adjust.
+    if getattr(origin, "model", type(origin)) is User:
+        return
+    apply([instance], sign=-1)
+
+
+def connect_signals():
+    pre_save.connect(_before_save, sender=CalorieRecord, dispatch_uid="rollups-pre-save")
+    post_save.connect(_after_save, sender=CalorieRecord, dispatch_uid="rollups-save")
+    post_delete.connect(_after_delete, sender=CalorieRecord, dispatch_uid="rollups-delete")
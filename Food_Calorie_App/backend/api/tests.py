@@ -1,3 +1,59 @@
+from django.contrib.auth.models import User
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .catalog import catalog
+from .models import CalorieRecord, DailyCalorieTotal, FoodItem
+
+
+class SaveRecordValidationTests(TestCase):
+    def setUp(self):
+        FoodItem.objects.create(name="Apple", calories_per_100g=52)
+        catalog.invalidate()
+        self.user = User.objects.create_user("eater", password="x")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def save(self, payload):
+        return self.client.post("/api/save_record/", payload, format="json")
+
+    def assertRejected(self, payload):
+        response = self.save(payload)
+        self.assertEqual(response.status_code, 400, response.data)
+        self.assertIn("error", response.data)
+        self.assertFalse(CalorieRecord.objects.exists())
+        self.assertFalse(DailyCalorieTotal.objects.exists())
+
+    def test_saves_a_valid_meal(self):
+        response = self.save({"items": [{"food_item": "apple", "servings": 2, "weight_in_grams": 150}]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["saved_items"][0]["total_calories"], 156.0)
+        self.assertEqual(DailyCalorieTotal.objects.get(user=self.user).total_calories, 156.0)
+
+    def test_rejects_items_that_are_not_objects(self):
+        self.assertRejected({"items": ["apple"]})
+        self.assertRejected({"meals": [{"items": [{"food_item": "Apple"}, 42]}]})
+
+    def test_rejects_meals_and_bodies_of_the_wrong_shape(self):
+        self.assertRejected({"items": "apple"})
+        self.assertRejected({"meals": {"items": []}})
+        self.assertRejected({"meals": ["apple"]})
+        self.assertRejected([{"food_item": "Apple"}])
+
+    def test_rejects_non_finite_quantities(self):
+        for value in ("nan", "inf", "-inf", "NaN"):
+            with self.subTest(value=value):
+                self.assertRejected({"items": [{"food_item": "Apple", "servings": value}]})
+                self.assertRejected({"items": [{"food_item": "Apple", "weight_in_grams": value}]})
+
+    def test_rejects_zero_and_negative_quantities(self):
+        for value in (0, -1, "-2.5"):
+            with self.subTest(value=value):
+                self.assertRejected({"items": [{"food_item": "Apple", "servings": value}]})
+                self.assertRejected({"items": [{"food_item": "Apple", "weight_in_grams": value}]})
+
+    def test_one_bad_item_saves_nothing(self):
+        self.assertRejected({"meals": [
+            {"items": [{"food_item": "Apple"}]},
+            {"items": [{"food_item": "Apple", "servings": "nan"}]},
+        ]})
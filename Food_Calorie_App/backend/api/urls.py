@@ -1,16 +1,26 @@
 from django.http import HttpResponse
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     path("register/", views.register),
     path("login/", views.login),
     path("upload/", views.upload_image),
+    path("upload/batch/", views.upload_batch),
+    path("upload/submit/", views.submit_image),
+    path("upload/<str:job_id>/", views.upload_status),
+    path("model/", views.model_status),
+    path("foods/", views.search_foods),
     path('save_record/', views.save_record),
     path("save/", views.save_record),
     path("records/", views.get_records),
     path("delete/<int:record_id>/", views.delete_record),
     path("summary/", views.calorie_summary),
+    path("summary/trend/", views.calorie_trend),
+    # Async variants for ASGI servers (uvicorn backend.asgi:application).
+    path("async/upload/", async_views.upload_image),
+    path("async/records/", async_views.get_records),
+    path("async/summary/", async_views.calorie_summary),
 ]
 
 
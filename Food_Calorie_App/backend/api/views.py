@@ -1,15 +1,21 @@
+import hashlib
+import time
+from concurrent.futures import TimeoutError
+from django.conf import settings
 from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
-from ultralytics import YOLO
-from .models import CalorieRecord, FoodItem
+from .catalog import catalog
+from .imaging import InvalidImage
+from .inference import InferenceUnavailable, current_service, get_service, job_status
+from . import rollups
+from .records import RecordError, delete_user_record, page_records, save_meals
 from datetime import date, timedelta
-import os
-
-model = YOLO("./best.pt") 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -46,111 +52,204 @@ def upload_image(request):
     if not image:
         return Response({"error": "No image uploaded"}, status=400)
 
-    temp_path = "temp.jpg"
-    with open(temp_path, "wb+") as f:
-        for chunk in image.chunks():
-            f.write(chunk)
+    try:
+        result = get_service().predict(image, timeout=settings.INFERENCE_TIMEOUT)
+    except InvalidImage as e:
+        return Response({"error": str(e)}, status=400)
+    except TimeoutError:
+        return Response({"error": "Food detection timed out, please retry."}, status=504)
+    except InferenceUnavailable:
+        return Response({"error": "Food detection is unavailable, please retry."}, status=503)
+    return Response(result)
 
-    results = model.predict(temp_path)
-    detected_items = []
 
-    for result in results:
-        if result.boxes is not None:
-            for cls_idx in result.boxes.cls:
-                detected_items.append(result.names[int(cls_idx)])
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def upload_batch(request):
+    """Detect food in several photos (multipart field "images", repeated) with one batched inference."""
+    images = request.FILES.getlist("images")
+    if not images:
+        return Response({"error": "No images uploaded"}, status=400)
+    if len(images) > settings.INFERENCE_MAX_UPLOAD_IMAGES:
+        return Response({"error": f"At most {settings.INFERENCE_MAX_UPLOAD_IMAGES} images per request"}, status=400)
+
+    started = time.perf_counter()
+    try:
+        results = get_service().predict_many(images, timeout=settings.INFERENCE_TIMEOUT)
+    except TimeoutError:
+        return Response({"error": "Food detection timed out, please retry."}, status=504)
+    except InferenceUnavailable:
+        return Response({"error": "Food detection is unavailable, please retry."}, status=503)
+    total_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    for image, result in zip(images, results):
+        result["filename"] = image.name
+    # Timings of images run by this request; duplicates in it share one timings dict.
+    timed = list({id(r["timings"]): r["timings"] for r in results if "timings" in r and not r.get("cached")}.values())
+    return Response({
+        "results": results,
+        "timings": {
+            "images": len(images),
+            "cached": sum(1 for r in results if r.get("cached")),
+            "decode_ms": round(sum(t["decode_ms"] + t["resize_ms"] for t in timed), 2),
+            "inference_ms": max((t["inference_ms"] for t in timed), default=0.0),
+            "total_ms": total_ms,
+        },
+    })
 
-    os.remove(temp_path)
-    return Response({"detected_items": list(set(detected_items))})
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def submit_image(request):
+    image = request.FILES.get("image")
+    if not image:
+        return Response({"error": "No image uploaded"}, status=400)
+
+    job_id = get_service().submit(image)
+    return Response({"job_id": job_id, "status": "pending"}, status=202)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def upload_status(request, job_id):
+    status = job_status(job_id)
+    if status is None:
+        return Response({"error": "Unknown or expired job"}, status=404)
+    return Response({"job_id": job_id, **status})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def model_status(request):
+    service = current_service()
+    if service is None:
+        return Response({"started": False})
+    return Response({"started": True, **service.stats()})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_foods(request):
+    """Autocomplete food names: ?q=<text>&limit=<n> (default 10, at most 50)."""
+    try:
+        limit = min(max(int(request.query_params.get("limit", 10)), 1), 50)
+    except ValueError:
+        return Response({"error": "limit must be an integer"}, status=400)
+    foods = catalog.search(request.query_params.get("q", ""), limit)
+    return Response([{"name": f.name, "calories_per_100g": f.calories_per_100g} for f in foods])
 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def save_record(request):
-    user = request.user
-    data = request.data  
-    saved_items = []
-
-    for item in data.get("items", []):
-        food_name = item.get("food_item")
-        servings = float(item.get("servings", 1))
-        weight_in_grams = float(item.get("weight_in_grams", 100))
-
-        
-        try:
-            food = FoodItem.objects.get(name__iexact=food_name)
-        except FoodItem.DoesNotExist:
-            return Response({"error": f"Food item '{food_name}' not found in database"}, status=400)
-
-        
-        total_calories = (food.calories_per_100g * weight_in_grams / 100) * servings
-
-       
-        record = CalorieRecord.objects.create(
-            user=user,
-            food_item=food.name,
-            servings=servings,
-            weight_in_grams=weight_in_grams,
-            total_calories=total_calories
-        )
-
-        saved_items.append({
-            "food_item": food.name,
-            "servings": servings,
-            "weight_in_grams": weight_in_grams,
-            "total_calories": total_calories
-        })
-
-    return Response({
+    """Save one meal ({"items": [...]}) or, for offline sync, many ({"meals": [{"items": [...]}, ...]})."""
+    data = request.data
+    batched = isinstance(data, dict) and "meals" in data
+    meals = data.get("meals") if batched else [data]
+    if not isinstance(meals, list) or not all(
+            isinstance(meal, dict) and isinstance(meal.get("items", []), list) for meal in meals):
+        return Response({"error": "Expected 'items' as a list, or 'meals' as a list of {\"items\": [...]}."}, status=400)
+
+    try:
+        saved = save_meals(request.user, [meal.get("items", []) for meal in meals])
+    except RecordError as e:
+        return Response({"error": str(e)}, status=400)
+
+    response = {
         "message": "Calorie records saved successfully!",
-        "saved_items": saved_items
-    })
+        "saved_items": [item for items in saved for item in items],
+    }
+    if batched:
+        response["meals"] = [{"saved_items": items} for items in saved]
+    return Response(response)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_records(request):
-    tab = request.query_params.get("tab", "daily")  # daily / weekly / monthly
-    today = date.today()
-
+    """Records of the tab's period, oldest first, `limit` at a time.
+
+    The body stays a plain list; when more records follow, the X-Next-Cursor
+    header holds the `cursor` to pass for the next page. Responses carry an
+    ETag and Last-Modified from the daily rollup, so unchanged polls get a 304.
+    """
+    start_date = records_start(request.query_params.get("tab", "daily"), date.today())
+    cursor = request.query_params.get("cursor")
+    try:
+        limit = min(max(int(request.query_params.get("limit", settings.RECORDS_PAGE_SIZE)), 1), 1000)
+    except ValueError:
+        return Response({"error": "limit must be an integer"}, status=400)
+
+    version = rollups.version(request.user, start_date)
+    headers, not_modified = records_validators(request, (start_date, cursor, limit), version)
+    if not_modified is not None:
+        return not_modified
+
+    try:
+        rows, next_cursor = page_records(request.user, start_date, cursor, limit)
+    except RecordError as e:
+        return Response({"error": str(e)}, status=400)
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return Response(rows, headers=headers)
+
+
+def records_start(tab, today):
+    """First date of a /records/ tab (daily / weekly / monthly), or None for all records."""
     if tab == "daily":
-        start_date = today
-    elif tab == "weekly":
-        start_date = today - timedelta(days=today.weekday())  # start of week
-    elif tab == "monthly":
-        start_date = today.replace(day=1)
-    else:
-        start_date = None
-
-    records = CalorieRecord.objects.filter(user=request.user)
-    if start_date:
-        records = records.filter(date__gte=start_date)
-
-    data = [
-        {
-            "id": r.id,
-            "food_item": r.food_item,
-            "servings": r.servings,
-            "weight_in_grams": r.weight_in_grams,
-            "total_calories": r.total_calories,
-            "date": r.date
-        } for r in records
-    ]
-    return Response(data)
+        return today
+    if tab == "weekly":
+        return today - timedelta(days=today.weekday())  # start of week
+    if tab == "monthly":
+        return today.replace(day=1)
+    return None
+
+
+def records_validators(request, params, version):
+    """(ETag/Last-Modified headers, 304 response or None) for a records page.
+
+    `params` identifies the page asked for and `version` is the rollup's
+    (record count, last change) for its period.
+    """
+    count, changed = version
+    etag = quote_etag(hashlib.md5(f"{request.user.pk}:{params}:{count}:{changed}".encode()).hexdigest())
+    last_modified = int(changed.timestamp()) if changed else None
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        for header, value in headers.items():
+            not_modified[header] = value
+    return headers, not_modified
 
 
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
 def delete_record(request, record_id):
-    CalorieRecord.objects.filter(id=record_id, user=request.user).delete()
+    delete_user_record(request.user, record_id)
     return Response({"message": "Record deleted"})
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def calorie_summary(request):
+    return Response(rollups.summary(request.user, date.today()))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def calorie_trend(request):
+    """Calories per day, week or month over the last ?days= days (default 30): ?group=day|week|month."""
+    group = request.query_params.get("group", "day")
+    if group not in rollups.TREND_GROUPS:
+        return Response({"error": f"group must be one of {', '.join(rollups.TREND_GROUPS)}"}, status=400)
+    try:
+        days = min(max(int(request.query_params.get("days", 30)), 1), 3660)
+    except ValueError:
+        return Response({"error": "days must be an integer"}, status=400)
     today = date.today()
-    daily = sum(r.total_calories for r in CalorieRecord.objects.filter(user=request.user, date=today))
-    monthly = sum(r.total_calories for r in CalorieRecord.objects.filter(user=request.user, date__month=today.month))
-    return Response({"daily": daily, "monthly": monthly})
+    return Response(rollups.trend(request.user, today - timedelta(days=days - 1), today, group))
 
 
 def home(request):
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -84,6 +85,8 @@ CORS_ALLOWED_ORIGINS = [
 # settings.py
 
 CORS_ALLOW_ALL_ORIGINS = True
+# Let the dashboard read the pagination header of /api/records/.
+CORS_EXPOSE_HEADERS = ["X-Next-Cursor"]
 
 
 
@@ -163,6 +166,60 @@ STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
 
+# Caches. "detections" holds YOLO results keyed by image hash + weights version;
+# LocMemCache evicts least recently used entries beyond MAX_ENTRIES.
+# "jobs" holds submit-and-poll job status. It must be shared by every server
+# process (gunicorn runs several), so it lives on disk; on multi-host setups
+# point it at Redis or the database instead.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "detections": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "detections",
+        "TIMEOUT": 24 * 60 * 60,
+        "OPTIONS": {"MAX_ENTRIES": 10_000, "CULL_FREQUENCY": 10},
+    },
+    "jobs": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("INFERENCE_JOBS_DIR", str(BASE_DIR / ".cache" / "inference-jobs")),
+        "TIMEOUT": 10 * 60,
+        "OPTIONS": {"MAX_ENTRIES": 20_000, "CULL_FREQUENCY": 10},
+    },
+}
+
+
+# Food detection (YOLO) inference pool, see api/inference.py
+
+FOOD_MODEL_PATH = BASE_DIR / "best.pt"
+# Detector backend: "ultralytics" (PyTorch, best.pt) or "onnx" (ONNX Runtime, see export_detector).
+FOOD_DETECTOR = os.getenv("FOOD_DETECTOR", "ultralytics")
+FOOD_ONNX_PATH = os.getenv("FOOD_ONNX_PATH", str(BASE_DIR / "best.onnx"))
+# CPU threads per inference worker (0 = library default, usually all cores).
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", "0"))
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "1"))
+INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", "8"))
+INFERENCE_BATCH_WINDOW_MS = int(os.getenv("INFERENCE_BATCH_WINDOW_MS", "10"))
+INFERENCE_TIMEOUT = int(os.getenv("INFERENCE_TIMEOUT", "120"))
+INFERENCE_IMGSZ = int(os.getenv("INFERENCE_IMGSZ", "640"))
+# Most photos accepted by one /api/upload/batch/ request (all run as one batch).
+INFERENCE_MAX_UPLOAD_IMAGES = int(os.getenv("INFERENCE_MAX_UPLOAD_IMAGES", "32"))
+# Start the pool and run one dummy inference per worker when the server starts.
+INFERENCE_WARMUP = os.getenv("INFERENCE_WARMUP", "0") == "1"
+
+# Records per page of /api/records/ when the client sends no ?limit=.
+RECORDS_PAGE_SIZE = int(os.getenv("RECORDS_PAGE_SIZE", "200"))
+
+# Seconds before a process reloads the in-memory FoodItem catalog (changes made in
+# this process invalidate it immediately).
+CATALOG_TTL = int(os.getenv("CATALOG_TTL", "300"))
+
+# Keep phone photos (up to 20 MB) in memory instead of spooling them to a temp file.
+FILE_UPLOAD_MAX_MEMORY_SIZE = 20 * 1024 * 1024
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -11,6 +11,25 @@ async function apiFetch(endpoint, options = {}) {
   return response.json();
 }
 
+// Follow X-Next-Cursor until every page of a paginated list has been read.
+async function apiFetchAll(endpoint) {
+  const token = localStorage.getItem("token");
+  const headers = token ? { Authorization: `Bearer ${token}` } : {};
+  const separator = endpoint.includes("?") ? "&" : "?";
+  let rows = [];
+  let cursor = null;
+  do {
+    const url = cursor
+      ? `${API_BASE}${endpoint}${separator}cursor=${encodeURIComponent(cursor)}`
+      : `${API_BASE}${endpoint}`;
+    const response = await fetch(url, { headers });
+    if (!response.ok) throw new Error("Request failed");
+    rows = rows.concat(await response.json());
+    cursor = response.headers.get("X-Next-Cursor");
+  } while (cursor);
+  return rows;
+}
+
 export default function Dashboard({ onLogout }) {
   const [file, setFile] = useState(null);
   const [loading, setLoading] = useState(false);
@@ -85,7 +104,7 @@ export default function Dashboard({ onLogout }) {
 
   async function fetchRecords(currentTab) {
     try {
-      const data = await apiFetch(`/records/?tab=${currentTab}`);
+      const data = await apiFetchAll(`/records/?tab=${currentTab}`);
       setRecords(data);
     } catch (err) {
       console.error(err);
@@ -94,20 +113,9 @@ export default function Dashboard({ onLogout }) {
 
   async function fetchSummaryTotals() {
     try {
-      const dailyData = await apiFetch(`/records/?tab=daily`);
-      const monthlyData = await apiFetch(`/records/?tab=monthly`);
-
-      const dailySum = dailyData.reduce(
-        (acc, r) => acc + (r.total_calories || 0),
-        0
-      );
-      const monthlySum = monthlyData.reduce(
-        (acc, r) => acc + (r.total_calories || 0),
-        0
-      );
-
-      setDailyTotal(dailySum);
-      setMonthlyTotal(monthlySum);
+      const totals = await apiFetch(`/summary/`);
+      setDailyTotal(totals.daily);
+      setMonthlyTotal(totals.monthly);
     } catch (err) {
       console.error("Error fetching summary totals:", err);
     }
@@ -1,65 +1,100 @@
 import os
-import re
+import sys
+import time
+from pathlib import Path
 import tweepy
 import pandas as pd
 import streamlit as st
-from textblob import TextBlob
 from dotenv import load_dotenv
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from sentiment_engine import LiveSentiment, SentimentStore, analyze_cached
+from collector import RateLimitWait, RateLimiter, collect_incremental, collect_new
+
 load_dotenv()
 BEARER_TOKEN = os.getenv("TWITTER_BEARER_TOKEN")
+MAX_RATE_LIMIT_WAIT = int(os.getenv("TWITTER_MAX_RATE_LIMIT_WAIT", "60"))
+LIVE_BATCH = 500
 
 if not BEARER_TOKEN:
     st.error("Set your TWITTER_BEARER_TOKEN in the .env file before running the app.")
     st.stop()
 
-client = tweepy.Client(bearer_token=BEARER_TOKEN)
-
-def clean_text(text):
-    text = text.lower()
-    text = re.sub(r"http\S+", "", text)
-    text = re.sub(r"@\w+", "", text)
-    text = re.sub(r"#", "", text)
-    text = re.sub(r"[^a-z\s]", "", text)
-    return text
-
-def get_sentiment(text):
-    polarity = TextBlob(text).sentiment.polarity
-    if polarity > 0:
-        return "Positive"
-    elif polarity < 0:
-        return "Negative"
-    else:
-        return "Neutral"
+@st.cache_resource
+def get_store():
+    return SentimentStore()
+
+
+@st.cache_resource
+def get_client():
+    # One limiter per process so every session shares the same view of the rate-limit window.
+    limiter = RateLimiter(max_wait=MAX_RATE_LIMIT_WAIT)
+    return limiter.install(tweepy.Client(bearer_token=BEARER_TOKEN)), limiter
 
-@st.cache_data(show_spinner=False)
-def fetch_tweets(keyword, limit=30):
+
+def fetch_tweets(keyword, limit=100):
+    query = f"{keyword} -is:retweet lang:en"
+    client, limiter = get_client()
     try:
-        limit = max(10, min(limit, 30))  # keep within safe limits for free API
-        query = f"{keyword} -is:retweet lang:en"
-        tweets = client.search_recent_tweets(query=query, max_results=limit)
-        if not tweets.data:
-            return pd.DataFrame(columns=["Tweet"])
-        texts = [tweet.text for tweet in tweets.data]
-        df = pd.DataFrame(texts, columns=["Tweet"])
-        df["Cleaned"] = df["Tweet"].apply(clean_text)
-        df["Sentiment"] = df["Cleaned"].apply(get_sentiment)
+        df, new = collect_incremental(client, get_store(), query, limit, limiter)
+        st.caption(f"{new} new tweets fetched since the last analysis of '{keyword}'.")
+        return df
+    except RateLimitWait as e:
+        df, new = e.partial
+        st.warning(f"Twitter API rate limit reached after {new} new tweets; "
+                   f"the window resets in {e.seconds / 60:.0f} minutes. Showing stored tweets.")
         return df
-    except tweepy.TooManyRequests:
-        st.error("Twitter API rate limit reached. Please wait 15 few minutes before trying again.")
-        return pd.DataFrame(columns=["Tweet"])
     except Exception as e:
         st.warning(f"Error fetching tweets: {e}")
         return pd.DataFrame(columns=["Tweet"])
 
+def run_live(keyword, interval):
+    """Poll for new tweets forever, updating rolling per-minute/per-hour charts.
+
+    Only tweets newer than the previous poll are fetched and scored; the
+    aggregates live in fixed-size ring buffers kept in the session.
+    """
+    query = f"{keyword} -is:retweet lang:en"
+    if st.session_state.get("live_query") != query:
+        st.session_state.live_query = query
+        st.session_state.live = LiveSentiment()
+    live = st.session_state.live
+    client, limiter = get_client()
+    status, minute_chart, hour_chart = st.empty(), st.empty(), st.empty()
+
+    while True:
+        try:
+            new, newest_id = collect_new(client, query, LIVE_BATCH, live.cursor, limiter)
+            live.cursor = newest_id or live.cursor
+            message = f"{len(new)} new tweets"
+        except RateLimitWait as e:
+            new, _ = e.partial
+            message = f"rate limited for {e.seconds / 60:.0f} more minutes"
+        except Exception as e:
+            new = pd.DataFrame(columns=["Tweet"])
+            message = f"error fetching tweets: {e}"
+
+        if not new.empty:
+            new = new[live.seen.filter_new(new["id"])].copy()
+        if not new.empty:
+            analyze_cached(new, "Tweet", "id", "twitter", get_store(), strip_mentions=True)
+        live.update(new, "created_at")
+
+        totals = ", ".join(f"{label}: {count}" for label, count in live.totals.items())
+        status.write(f"Last poll {time.strftime('%H:%M:%S')}: {message}. Totals so far: {totals}")
+        minute_chart.line_chart(live.per_minute.frame())
+        hour_chart.bar_chart(live.per_hour.frame())
+        time.sleep(interval)
+
+
 st.set_page_config(page_title="Twitter Sentiment Analysis", layout="centered")
 st.title("Twitter Sentiment Analysis App")
 st.write("Analyze the sentiment of recent tweets on any topic using TextBlob.")
 
 keyword = st.text_input("Enter a hashtag or keyword", "#AI")
-tweet_count = st.slider("Number of tweets to fetch", 10, 30, 10)
+tweet_count = st.slider("Number of tweets to analyze", 10, 1000, 100, step=10)
 
 if st.button("Analyze"):
     with st.spinner("Fetching and analyzing tweets..."):
@@ -83,7 +118,13 @@ if st.button("Analyze"):
         st.write(sentiment_counts.round(2).astype(str) + "%")
 
         st.subheader("Most Positive Tweet")
-        st.write(df.loc[df["Cleaned"].apply(lambda x: TextBlob(x).sentiment.polarity).idxmax(), "Tweet"])
+        st.write(df.loc[df["Polarity"].idxmax(), "Tweet"])
 
         st.subheader("Most Negative Tweet")
-        st.write(df.loc[df["Cleaned"].apply(lambda x: TextBlob(x).sentiment.polarity).idxmin(), "Tweet"])
+        st.write(df.loc[df["Polarity"].idxmin(), "Tweet"])
+
+st.subheader("📡 Live Mode")
+st.write("Keep polling the keyword for new tweets and chart sentiment per minute (line) and per hour (bars).")
+poll_interval = st.slider("Poll every (seconds)", 15, 300, 60, step=15)
+if st.toggle("Track this keyword live"):
+    run_live(keyword, poll_interval)
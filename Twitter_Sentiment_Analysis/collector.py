@@ -0,0 +1,171 @@
+"""Paginated, rate-limit-aware tweet collection with incremental since_id polling.
+
+`collect_new` pages through `search_recent_tweets` with `tweepy.Paginator`
+until it has the requested number of tweets, starting after the newest tweet
+seen for that query in an earlier run. `RateLimiter` reads the
+x-rate-limit-* headers of every response and waits for the window to reset
+rather than letting a request fail.
+"""
+import functools
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+import tweepy
+
+# sentiment_engine lives at the repository root, next to this app's folder.
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from sentiment_engine import analyze_cached, label_polarity
+
+
+MAX_PAGE_SIZE = 100
+MIN_PAGE_SIZE = 10
+RECENT_IDS_KEPT = 1000
+WINDOW_SECONDS = 15 * 60
+TWEET_COLUMNS = ["id", "Tweet", "created_at"]
+
+
+class RateLimitWait(Exception):
+    """The next request would have to wait longer than the caller allows."""
+
+    def __init__(self, seconds, partial=None):
+        super().__init__(f"Rate limit window resets in {seconds:.0f} seconds.")
+        self.seconds = seconds
+        self.partial = partial
+
+
+class RateLimiter:
+    """Track the search endpoint's rate-limit window from response headers."""
+
+    def __init__(self, max_wait=60, sleep=time.sleep, clock=time.time):
+        self.max_wait = max_wait
+        self.remaining = None
+        self.reset_at = None
+        self._sleep = sleep
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def observe(self, response, *args, **kwargs):
+        """requests response hook: remember x-rate-limit-remaining / reset."""
+        headers = response.headers
+        with self._lock:
+            if "x-rate-limit-remaining" in headers:
+                self.remaining = int(headers["x-rate-limit-remaining"])
+            if "x-rate-limit-reset" in headers:
+                self.reset_at = int(headers["x-rate-limit-reset"])
+            if response.status_code == 429:
+                self.remaining = 0
+                if "x-rate-limit-reset" not in headers:
+                    self.reset_at = int(self._clock()) + WINDOW_SECONDS
+        return response
+
+    def install(self, client):
+        if self.observe not in client.session.hooks["response"]:
+            client.session.hooks["response"].append(self.observe)
+        return client
+
+    def wait_seconds(self):
+        with self._lock:
+            if self.remaining is None or self.remaining > 0 or self.reset_at is None:
+                return 0
+            return max(0, self.reset_at - self._clock() + 1)
+
+    def acquire(self):
+        """Block until a request may be sent, or raise RateLimitWait if that takes too long."""
+        wait = self.wait_seconds()
+        if wait > self.max_wait:
+            raise RateLimitWait(wait)
+        if wait > 0:
+            self._sleep(wait)
+            with self._lock:
+                self.remaining = None
+
+    def paced(self, method):
+        @functools.wraps(method)  # Paginator dispatches on the method's __name__
+        def call(*args, **kwargs):
+            self.acquire()
+            return method(*args, **kwargs)
+        return call
+
+
+def collect_new(client, query, target, since_id=None, limiter=None):
+    """Fetch up to `target` tweets newer than `since_id`, newest first.
+
+    Returns (tweets DataFrame, newest_id). A 429 mid-way is absorbed by waiting
+    for the window reset and resuming from the last pagination token; if the
+    wait exceeds the limiter's `max_wait`, RateLimitWait carries the partial result.
+    """
+    limiter = limiter or RateLimiter()
+    page_size = max(MIN_PAGE_SIZE, min(MAX_PAGE_SIZE, target))
+    rows = []
+    newest_id = None
+    next_token = None
+
+    while len(rows) < target:
+        paginator = tweepy.Paginator(
+            limiter.paced(client.search_recent_tweets),
+            query=query,
+            max_results=page_size,
+            since_id=since_id,
+            tweet_fields=["created_at"],
+            pagination_token=next_token,
+        )
+        try:
+            for response in paginator:
+                meta = response.meta or {}
+                if newest_id is None and meta.get("newest_id"):
+                    newest_id = meta["newest_id"]
+                for tweet in response.data or []:
+                    rows.append((str(tweet.id), tweet.text, tweet.created_at))
+                next_token = meta.get("next_token")
+                if len(rows) >= target or not next_token:
+                    break
+            break
+        except tweepy.TooManyRequests as e:
+            limiter.observe(e.response)
+            if limiter.wait_seconds() > limiter.max_wait:
+                partial = pd.DataFrame(rows[:target], columns=TWEET_COLUMNS)
+                raise RateLimitWait(limiter.wait_seconds(), (partial, newest_id)) from e
+        except RateLimitWait as e:
+            e.partial = (pd.DataFrame(rows[:target], columns=TWEET_COLUMNS), newest_id)
+            raise
+
+    return pd.DataFrame(rows[:target], columns=TWEET_COLUMNS), newest_id
+
+
+def collect_incremental(client, store, query, target, limiter=None):
+    """Poll `query` for tweets since the last run and return the `target` most recent ones.
+
+    The since_id and the ids of recently collected tweets are kept in the
+    SentimentStore, so only tweets not seen before are requested and scored.
+    Returns (DataFrame with id, Tweet, Cleaned, Polarity, Sentiment; number of new tweets).
+    """
+    cursor = store.get_cursor("twitter", query) or {}
+    rate_limited = None
+    try:
+        new, newest_id = collect_new(client, query, target, cursor.get("since_id"), limiter)
+    except RateLimitWait as e:
+        new, newest_id = e.partial
+        rate_limited = e
+
+    if not new.empty:
+        analyze_cached(new, "Tweet", "id", "twitter", store, strip_mentions=True)
+        # A partial crawl must not advance since_id past tweets it never saw.
+        if rate_limited is None and newest_id:
+            cursor["since_id"] = newest_id
+        recent = list(dict.fromkeys(new["id"].tolist() + cursor.get("recent_ids", [])))
+        cursor["recent_ids"] = recent[:RECENT_IDS_KEPT]
+        store.put_cursor("twitter", query, cursor)
+
+    ids = cursor.get("recent_ids", [])[:target]
+    items = store.get_items("twitter", ids).set_index("item_id").reindex(ids).dropna(subset=["raw"])
+    df = items.reset_index().rename(columns={
+        "item_id": "id", "raw": "Tweet", "cleaned": "Cleaned", "polarity": "Polarity",
+    })
+    df["Sentiment"] = df["Polarity"].map(label_polarity)
+
+    if rate_limited is not None:
+        raise RateLimitWait(rate_limited.seconds, (df, len(new)))
+    return df, len(new)
@@ -0,0 +1,185 @@
+"""Tests for collector.py against a local stub of the recent-search endpoint.
+
+A real tweepy.Client is used; its requests session is mounted on
+`SearchStub`, so pagination, since_id, 429 handling and the rate-limit
+response hook all run as they do against the API. Time is faked, nothing
+sleeps.
+
+    python -m unittest test_collector        # from Twitter_Sentiment_Analysis/
+"""
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import requests
+import tweepy
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from collector import RateLimitWait, RateLimiter, collect_incremental, collect_new
+from sentiment_engine import SentimentStore
+
+
+class FakeClock:
+    def __init__(self, now=1_700_000_000):
+        self.now = now
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class SearchStub(BaseAdapter):
+    """Serves GET /2/tweets/search/recent from an in-memory list of tweets, newest first.
+
+    `next_token` is the offset of the next page. `rate_limits` maps a request
+    number (1-based) to a 429 answer whose window resets that many seconds later.
+    """
+
+    def __init__(self, clock, count=0):
+        super().__init__()
+        self.clock = clock
+        self.tweets = []
+        self.requests = []
+        self.rate_limits = {}
+        self.add(count)
+
+    def add(self, count):
+        start = int(self.tweets[0]["id"]) + 1 if self.tweets else 1000
+        new = [{"id": str(i), "text": f"tweet {i} is great", "edit_history_tweet_ids": [str(i)],
+                "created_at": "2024-01-01T00:00:00.000Z"} for i in range(start, start + count)]
+        self.tweets = new[::-1] + self.tweets
+
+    def send(self, request, **kwargs):
+        params = {k: v[0] for k, v in parse_qs(urlparse(request.url).query).items()}
+        self.requests.append(params)
+        if len(self.requests) in self.rate_limits:
+            reset = str(int(self.clock()) + self.rate_limits[len(self.requests)])
+            body = {"title": "Too Many Requests", "detail": "Too Many Requests", "status": 429}
+            return self._response(request, 429, body, remaining=0, reset=reset)
+        reset = str(int(self.clock()) + 900)
+
+        since_id = int(params.get("since_id", 0))
+        matching = [t for t in self.tweets if int(t["id"]) > since_id]
+        offset = int(params.get("next_token", 0))
+        page = matching[offset:offset + int(params["max_results"])]
+        meta = {"result_count": len(page)}
+        if page:
+            meta.update(newest_id=page[0]["id"], oldest_id=page[-1]["id"])
+        if offset + len(page) < len(matching):
+            meta["next_token"] = str(offset + len(page))
+        body = {"data": page, "meta": meta} if page else {"meta": meta}
+        return self._response(request, 200, body, remaining=100, reset=reset)
+
+    def _response(self, request, status, body, remaining, reset):
+        response = requests.Response()
+        response.status_code = status
+        response.reason = "OK" if status == 200 else "Too Many Requests"
+        response.headers = CaseInsensitiveDict({
+            "content-type": "application/json",
+            "x-rate-limit-remaining": str(remaining),
+            "x-rate-limit-reset": reset,
+        })
+        response._content = json.dumps(body).encode()
+        response.raw = io.BytesIO(response._content)
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+class CollectorTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.stub = SearchStub(self.clock, count=250)
+        self.client = tweepy.Client(bearer_token="test")
+        self.client.session.mount("https://api.twitter.com/", self.stub)
+        self.limiter = RateLimiter(max_wait=60, sleep=self.clock.sleep, clock=self.clock)
+        self.limiter.install(self.client)
+
+    def make_store(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        store = SentimentStore(Path(tmp.name) / "sentiment.sqlite3")
+        self.addCleanup(store.close)
+        return store
+
+    def test_pages_until_target(self):
+        tweets, newest_id = collect_new(self.client, "python", 230, limiter=self.limiter)
+
+        self.assertEqual(len(tweets), 230)
+        self.assertEqual(tweets["id"].tolist(), [t["id"] for t in self.stub.tweets[:230]])
+        self.assertEqual(newest_id, self.stub.tweets[0]["id"])
+        self.assertEqual([r.get("next_token") for r in self.stub.requests], [None, "100", "200"])
+        self.assertTrue(all(r["max_results"] == "100" for r in self.stub.requests))
+
+    def test_stops_when_results_run_out(self):
+        tweets, _ = collect_new(self.client, "python", 1000, limiter=self.limiter)
+
+        self.assertEqual(len(tweets), 250)
+        self.assertEqual(len(self.stub.requests), 3)
+
+    def test_since_id_is_reused_across_runs(self):
+        store = self.make_store()
+        first, new_count = collect_incremental(self.client, store, "python", 50, limiter=self.limiter)
+        self.assertEqual(new_count, 50)
+        newest = self.stub.tweets[0]["id"]
+        self.assertEqual(store.get_cursor("twitter", "python")["since_id"], newest)
+
+        self.stub.add(5)
+        self.stub.requests.clear()
+        second, new_count = collect_incremental(self.client, store, "python", 50, limiter=self.limiter)
+
+        self.assertEqual(self.stub.requests[0]["since_id"], newest)
+        self.assertEqual(new_count, 5)
+        # The 5 new tweets first, then the most recent ones from the previous run, from the store.
+        self.assertEqual(second["id"].tolist(), [t["id"] for t in self.stub.tweets[:5]] + first["id"].tolist()[:45])
+        self.assertEqual(store.get_cursor("twitter", "python")["since_id"], self.stub.tweets[0]["id"])
+        self.assertTrue({"Cleaned", "Polarity", "Sentiment"} <= set(second.columns))
+
+    def test_resumes_after_429_from_the_same_page(self):
+        self.stub.rate_limits = {2: 30}
+        tweets, _ = collect_new(self.client, "python", 230, limiter=self.limiter)
+
+        self.assertEqual(len(tweets), 230)
+        self.assertFalse(tweets["id"].duplicated().any())
+        self.assertEqual([r.get("next_token") for r in self.stub.requests], [None, "100", "100", "200"])
+        self.assertEqual(len(self.clock.slept), 1)
+        self.assertGreaterEqual(self.clock.slept[0], 30)
+
+    def test_long_rate_limit_returns_partial_results(self):
+        self.stub.rate_limits = {2: 600}
+        with self.assertRaises(RateLimitWait) as raised:
+            collect_new(self.client, "python", 230, limiter=self.limiter)
+
+        partial, newest_id = raised.exception.partial
+        self.assertEqual(len(partial), 100)
+        self.assertEqual(newest_id, self.stub.tweets[0]["id"])
+        self.assertGreater(raised.exception.seconds, 60)
+        self.assertEqual(self.clock.slept, [])
+
+    def test_partial_crawl_does_not_advance_since_id(self):
+        store = self.make_store()
+        self.stub.rate_limits = {2: 600}
+        with self.assertRaises(RateLimitWait) as raised:
+            collect_incremental(self.client, store, "python", 230, limiter=self.limiter)
+
+        df, new_count = raised.exception.partial
+        self.assertEqual(new_count, 100)
+        self.assertEqual(len(df), 100)
+        cursor = store.get_cursor("twitter", "python")
+        self.assertNotIn("since_id", cursor)
+        self.assertEqual(len(cursor["recent_ids"]), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
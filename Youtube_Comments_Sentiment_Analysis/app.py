@@ -1,14 +1,19 @@
 import os
-import re
+import sys
+import time
+from pathlib import Path
 import pandas as pd
 import streamlit as st
-from textblob import TextBlob
 from dotenv import load_dotenv
 import matplotlib.pyplot as plt
 import seaborn as sns
 from googleapiclient.discovery import build
 from urllib.parse import urlparse, parse_qs
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from sentiment_engine import LiveSentiment, SentimentStore, analyze_cached, load_cached_query
+from harvester import QuotaExceeded, harvest, poll_new_comments
+
 load_dotenv()
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
@@ -18,6 +23,10 @@ if not YOUTUBE_API_KEY:
 
 youtube = build("youtube", "v3", developerKey=YOUTUBE_API_KEY)
 
+@st.cache_resource
+def get_store():
+    return SentimentStore()
+
 def extract_video_id(url):
     parsed_url = urlparse(url)
     if parsed_url.hostname in ("www.youtube.com", "youtube.com"):
@@ -28,21 +37,6 @@ def extract_video_id(url):
     else:
         return None
 
-def clean_text(text):
-    text = text.lower()
-    text = re.sub(r"http\S+", "", text)
-    text = re.sub(r"[^a-z\s]", "", text)
-    return text
-
-def get_sentiment(text):
-    polarity = TextBlob(text).sentiment.polarity
-    if polarity > 0:
-        return "Positive"
-    elif polarity < 0:
-        return "Negative"
-    else:
-        return "Neutral"
-
 @st.cache_data(show_spinner=False)
 def fetch_comments(video_url, limit=50):
     video_id = extract_video_id(video_url)
@@ -51,6 +45,12 @@ def fetch_comments(video_url, limit=50):
         return pd.DataFrame(columns=["Comment"])
 
     try:
+        store = get_store()
+        cache_key = f"{video_id}|{limit}"
+        cached = load_cached_query("youtube", cache_key, store)
+        if cached is not None:
+            return cached.rename(columns={"item_id": "comment_id", "raw": "Comment"})
+
         request = youtube.commentThreads().list(
             part="snippet",
             videoId=video_id,
@@ -59,15 +59,17 @@ def fetch_comments(video_url, limit=50):
         )
         response = request.execute()
 
-        comments = [item["snippet"]["topLevelComment"]["snippet"]["textDisplay"]
-                    for item in response.get("items", [])]
+        comments = [item["snippet"]["topLevelComment"] for item in response.get("items", [])]
 
         if not comments:
             return pd.DataFrame(columns=["Comment"])
 
-        df = pd.DataFrame(comments, columns=["Comment"])
-        df["Cleaned"] = df["Comment"].apply(clean_text)
-        df["Sentiment"] = df["Cleaned"].apply(get_sentiment)
+        df = pd.DataFrame({
+            "comment_id": [c["id"] for c in comments],
+            "Comment": [c["snippet"]["textDisplay"] for c in comments],
+        })
+        analyze_cached(df, "Comment", "comment_id", "youtube", store)
+        store.put_query("youtube", cache_key, df["comment_id"])
         return df
 
     except Exception as e:
@@ -78,33 +80,130 @@ st.set_page_config(page_title="YouTube Comment Sentiment Analysis", layout="cent
 st.title("YouTube Comment Sentiment Analysis App")
 st.write("Analyze the sentiment of comments from any YouTube video using TextBlob.")
 
-video_url = st.text_input("Enter YouTube video URL")
-comment_count = st.slider("Number of comments to fetch", 10, 100, 50)
+def show_results(df):
+    st.success(f"Analyzed {len(df)} comments")
 
-if st.button("Analyze"):
-    with st.spinner("Fetching and analyzing comments..."):
-        df = fetch_comments(video_url, comment_count)
+    st.subheader("Sample Comments")
+    st.dataframe(df[["Comment", "Sentiment"]].head(10))
 
-    if df.empty:
-        st.warning("No comments found or API limit reached.")
-    else:
-        st.success(f"Analyzed {len(df)} comments")
+    st.subheader("Sentiment Distribution")
+    fig, ax = plt.subplots()
+    sns.countplot(x="Sentiment", data=df, palette="viridis", ax=ax)
+    plt.title("Sentiment Breakdown")
+    st.pyplot(fig)
+
+    st.subheader("Summary")
+    sentiment_counts = df["Sentiment"].value_counts(normalize=True) * 100
+    st.write(sentiment_counts.round(2).astype(str) + "%")
+
+    st.subheader("Most Positive Comment")
+    st.write(df.loc[df["Polarity"].idxmax(), "Comment"])
+
+    st.subheader("Most Negative Comment")
+    st.write(df.loc[df["Polarity"].idxmin(), "Comment"])
+
+
+def harvest_comments(video_urls, include_replies, max_comments, workers):
+    video_ids = [extract_video_id(url.strip()) for url in video_urls if url.strip()]
+    if not all(video_ids):
+        st.warning("One or more YouTube URLs are invalid.")
+        video_ids = [v for v in video_ids if v]
+
+    store = get_store()
+    progress = st.empty()
+    frames = []
+    counts = pd.Series(dtype=int)
+    try:
+        pages = harvest(
+            video_ids,
+            lambda: build("youtube", "v3", developerKey=YOUTUBE_API_KEY),
+            max_workers=workers,
+            include_replies=include_replies,
+            max_comments=max_comments or None,
+        )
+        # Score each page as soon as it arrives instead of waiting for the whole crawl.
+        for page in pages:
+            analyze_cached(page, "Comment", "comment_id", "youtube", store)
+            frames.append(page)
+            counts = counts.add(page["Sentiment"].value_counts(), fill_value=0)
+            with progress.container():
+                st.write(f"Fetched and scored {int(counts.sum())} comments so far...")
+                st.bar_chart(counts)
+    except QuotaExceeded as e:
+        st.error(f"{e} Showing the comments fetched so far.")
+    except Exception as e:
+        st.warning(f"Error fetching comments: {e}")
+    progress.empty()
 
-        st.subheader("Sample Comments")
-        st.dataframe(df[["Comment", "Sentiment"]].head(10))
+    if not frames:
+        return pd.DataFrame(columns=["Comment"])
+    return pd.concat(frames, ignore_index=True)
 
-        st.subheader("Sentiment Distribution")
-        fig, ax = plt.subplots()
-        sns.countplot(x="Sentiment", data=df, palette="viridis", ax=ax)
-        plt.title("Sentiment Breakdown")
-        st.pyplot(fig)
 
-        st.subheader("Summary")
-        sentiment_counts = df["Sentiment"].value_counts(normalize=True) * 100
-        st.write(sentiment_counts.round(2).astype(str) + "%")
+def run_live(video_url, interval):
+    """Poll a video for new comments forever, updating rolling per-minute/per-hour charts.
 
-        st.subheader("Most Positive Comment")
-        st.write(df.loc[df["Cleaned"].apply(lambda x: TextBlob(x).sentiment.polarity).idxmax(), "Comment"])
+    Comments are read newest first and only ones not seen before are scored;
+    the aggregates live in fixed-size ring buffers kept in the session.
+    """
+    video_id = extract_video_id(video_url)
+    if not video_id:
+        st.warning("Invalid YouTube URL.")
+        return
+    if st.session_state.get("live_video") != video_id:
+        st.session_state.live_video = video_id
+        st.session_state.live = LiveSentiment()
+    live = st.session_state.live
+    status, minute_chart, hour_chart = st.empty(), st.empty(), st.empty()
+
+    while True:
+        try:
+            new = poll_new_comments(youtube, video_id, live.seen)
+            message = f"{len(new)} new comments"
+        except QuotaExceeded as e:
+            st.error(str(e))
+            return
+        except Exception as e:
+            new = pd.DataFrame(columns=["Comment"])
+            message = f"error fetching comments: {e}"
+
+        if not new.empty:
+            analyze_cached(new, "Comment", "comment_id", "youtube", get_store())
+        live.update(new, "published_at")
+
+        totals = ", ".join(f"{label}: {count}" for label, count in live.totals.items())
+        status.write(f"Last poll {time.strftime('%H:%M:%S')}: {message}. Totals so far: {totals}")
+        minute_chart.line_chart(live.per_minute.frame())
+        hour_chart.bar_chart(live.per_hour.frame())
+        time.sleep(interval)
+
+
+mode = st.radio("Mode", ["Quick sample", "Full harvest", "Live"], horizontal=True)
+
+if mode == "Quick sample":
+    video_url = st.text_input("Enter YouTube video URL")
+    comment_count = st.slider("Number of comments to fetch", 10, 100, 50)
+elif mode == "Live":
+    video_url = st.text_input("Enter YouTube video URL")
+    poll_interval = st.slider("Poll every (seconds)", 15, 300, 60, step=15)
+    st.write("Keep polling the video for new comments and chart sentiment per minute (line) and per hour (bars).")
+    if st.toggle("Track this video live"):
+        run_live(video_url, poll_interval)
+    st.stop()
+else:
+    video_urls = st.text_area("Enter YouTube video URLs (one per line)").splitlines()
+    include_replies = st.checkbox("Include replies", value=True)
+    max_comments = st.number_input("Max comments per video (0 = all)", min_value=0, value=0, step=100)
+    workers = st.slider("Videos fetched in parallel", 1, 8, 4)
+
+if st.button("Analyze"):
+    if mode == "Quick sample":
+        with st.spinner("Fetching and analyzing comments..."):
+            df = fetch_comments(video_url, comment_count)
+    else:
+        df = harvest_comments(video_urls, include_replies, int(max_comments), workers)
 
-        st.subheader("Most Negative Comment")
-        st.write(df.loc[df["Cleaned"].apply(lambda x: TextBlob(x).sentiment.polarity).idxmin(), "Comment"])
+    if df.empty:
+        st.warning("No comments found or API limit reached.")
+    else:
+        show_results(df)
@@ -0,0 +1,179 @@
+"""Full-pagination comment harvester for one or many YouTube videos.
+
+Pages are fetched by a bounded pool of threads (one API client per thread)
+and handed to the caller as soon as they arrive, so scoring can start before
+the crawl finishes. Rate-limit and server errors are retried with exponential
+back-off; an exhausted daily quota stops the crawl with `QuotaExceeded`.
+"""
+import json
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from googleapiclient.errors import HttpError
+
+
+PAGE_SIZE = 100
+RETRY_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+COLUMNS = ["video_id", "comment_id", "parent_id", "Comment", "published_at", "like_count"]
+
+
+class QuotaExceeded(Exception):
+    pass
+
+
+def _error_reason(error):
+    try:
+        return json.loads(error.content)["error"]["errors"][0]["reason"]
+    except (ValueError, KeyError, IndexError, TypeError):
+        return ""
+
+
+def execute_with_backoff(request, max_retries=5, base_delay=1.0, sleep=time.sleep):
+    for attempt in range(max_retries + 1):
+        try:
+            return request.execute()
+        except HttpError as e:
+            status = int(e.resp.status)
+            reason = _error_reason(e)
+            if reason == "quotaExceeded":
+                raise QuotaExceeded("YouTube API daily quota exhausted.") from e
+            retryable = status == 429 or status >= 500 or reason in RETRY_REASONS
+            if not retryable or attempt == max_retries:
+                raise
+            sleep(base_delay * 2 ** attempt + random.uniform(0, base_delay))
+
+
+def _row(video_id, comment, parent_id=None):
+    snippet = comment["snippet"]
+    return {
+        "video_id": video_id,
+        "comment_id": comment["id"],
+        "parent_id": parent_id,
+        "Comment": snippet.get("textDisplay", ""),
+        "published_at": snippet.get("publishedAt"),
+        "like_count": snippet.get("likeCount", 0),
+    }
+
+
+def _iter_replies(youtube, parent_id, **backoff):
+    page_token = None
+    while True:
+        params = dict(part="snippet", parentId=parent_id, maxResults=PAGE_SIZE, textFormat="plainText")
+        if page_token:
+            params["pageToken"] = page_token
+        response = execute_with_backoff(youtube.comments().list(**params), **backoff)
+        yield from response.get("items", [])
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return
+
+
+def iter_comment_pages(youtube, video_id, include_replies=True, max_comments=None, order="relevance", **backoff):
+    """Yield one list of comment rows per commentThreads page, following nextPageToken."""
+    page_token = None
+    fetched = 0
+    while True:
+        params = dict(part="snippet,replies" if include_replies else "snippet", videoId=video_id,
+                      maxResults=PAGE_SIZE, textFormat="plainText", order=order)
+        if page_token:
+            params["pageToken"] = page_token
+        response = execute_with_backoff(youtube.commentThreads().list(**params), **backoff)
+
+        rows = []
+        for item in response.get("items", []):
+            top = item["snippet"]["topLevelComment"]
+            rows.append(_row(video_id, top))
+            if not include_replies:
+                continue
+            # The thread only embeds a handful of replies; page through the rest.
+            inline = item.get("replies", {}).get("comments", [])
+            if item["snippet"].get("totalReplyCount", 0) > len(inline):
+                inline = _iter_replies(youtube, top["id"], **backoff)
+            rows.extend(_row(video_id, reply, parent_id=top["id"]) for reply in inline)
+
+        if max_comments is not None:
+            rows = rows[:max_comments - fetched]
+        fetched += len(rows)
+        if rows:
+            yield rows
+
+        page_token = response.get("nextPageToken")
+        if not page_token or (max_comments is not None and fetched >= max_comments):
+            return
+
+
+def poll_new_comments(youtube, video_id, seen, max_pages=5, **backoff):
+    """Return top-level comments posted since the last poll, newest first.
+
+    Pages are read in `order="time"` until one contains a comment already in
+    `seen` (anything with `filter_new(ids)`, e.g. `sentiment_engine.RecentIds`).
+    """
+    frames = []
+    for rows in iter_comment_pages(youtube, video_id, include_replies=False, order="time", **backoff):
+        page = pd.DataFrame(rows, columns=COLUMNS)
+        new = seen.filter_new(page["comment_id"])
+        frames.append(page[new])
+        if not new.all() or len(frames) >= max_pages:
+            break
+    if not frames:
+        return pd.DataFrame(columns=COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+_DONE = object()
+
+
+def harvest(video_ids, client_factory, max_workers=4, include_replies=True, max_comments=None,
+            buffer_pages=32, **backoff):
+    """Crawl several videos concurrently, yielding a DataFrame per page as it arrives.
+
+    `client_factory()` must return a new YouTube API client; one is built per
+    worker thread because the underlying HTTP client is not thread-safe.
+    At most `buffer_pages` pages wait in memory for the consumer.
+    """
+    video_ids = list(dict.fromkeys(v for v in video_ids if v))
+    pages = queue.Queue(maxsize=buffer_pages)
+    local = threading.local()
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def crawl(video_id):
+        try:
+            if not hasattr(local, "youtube"):
+                local.youtube = client_factory()
+            for rows in iter_comment_pages(local.youtube, video_id, include_replies, max_comments, **backoff):
+                if not put(pd.DataFrame(rows, columns=COLUMNS)):
+                    return
+        except Exception as e:
+            put(e)
+        finally:
+            put(_DONE)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(video_ids) or 1)))
+    try:
+        for video_id in video_ids:
+            pool.submit(crawl, video_id)
+        remaining = len(video_ids)
+        while remaining:
+            item = pages.get()
+            if item is _DONE:
+                remaining -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,228 @@
+"""Tests for harvester.py against an in-memory fake of the YouTube Data API client.
+
+`FakeYouTube` answers commentThreads().list and comments().list the way the
+API does (maxResults, pageToken/nextPageToken, a few inline replies per
+thread) and can fail requests with scripted HttpErrors. Back-off sleeps are
+recorded instead of slept.
+
+    python -m unittest test_harvester        # from Youtube_Comments_Sentiment_Analysis/
+"""
+import json
+import unittest
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from harvester import QuotaExceeded, execute_with_backoff, harvest, iter_comment_pages
+
+INLINE_REPLIES = 5  # commentThreads embeds at most this many replies
+
+
+def http_error(status, reason):
+    content = json.dumps({"error": {"code": status, "errors": [{"reason": reason}]}}).encode()
+    return HttpError(httplib2.Response({"status": status}), content)
+
+
+def comment(comment_id, text):
+    return {"id": comment_id, "snippet": {"textDisplay": text, "publishedAt": "2024-01-01T00:00:00Z",
+                                          "likeCount": 0}}
+
+
+def make_video(threads, replies=None, prefix="c"):
+    """`threads` top-level comments; `replies` maps a thread index to its reply count."""
+    replies = replies or {}
+    return [
+        {"comment": comment(f"{prefix}{i}", f"comment {i}"),
+         "replies": [comment(f"{prefix}{i}.r{j}", f"reply {j} to {i}") for j in range(replies.get(i, 0))]}
+        for i in range(threads)
+    ]
+
+
+class FakeRequest:
+    def __init__(self, client, respond):
+        self.client = client
+        self.respond = respond
+
+    def execute(self):
+        if self.client.failures:
+            raise self.client.failures.pop(0)
+        return self.respond()
+
+
+class FakeResource:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+
+    def list(self, **params):
+        self.client.calls.append((self.name, params))
+        respond = self.client.thread_page if self.name == "commentThreads" else self.client.reply_page
+        return FakeRequest(self.client, lambda: respond(params))
+
+
+class FakeYouTube:
+    """Serves comment threads for `videos` ({video_id: make_video(...)}); `failures` are raised first, in order."""
+
+    def __init__(self, videos, failures=None):
+        self.videos = videos
+        self.failures = list(failures or [])
+        self.calls = []
+
+    def commentThreads(self):
+        return FakeResource(self, "commentThreads")
+
+    def comments(self):
+        return FakeResource(self, "comments")
+
+    @staticmethod
+    def _page(items, params):
+        offset = int(params.get("pageToken", 0))
+        end = offset + params["maxResults"]
+        response = {"items": items[offset:end]}
+        if end < len(items):
+            response["nextPageToken"] = str(end)
+        return response
+
+    def thread_page(self, params):
+        threads = []
+        for thread in self.videos[params["videoId"]]:
+            item = {"id": thread["comment"]["id"], "snippet": {
+                "topLevelComment": thread["comment"], "totalReplyCount": len(thread["replies"])}}
+            if "replies" in params["part"] and thread["replies"]:
+                item["replies"] = {"comments": thread["replies"][:INLINE_REPLIES]}
+            threads.append(item)
+        return self._page(threads, params)
+
+    def reply_page(self, params):
+        for threads in self.videos.values():
+            for thread in threads:
+                if thread["comment"]["id"] == params["parentId"]:
+                    return self._page(thread["replies"], params)
+        raise http_error(404, "commentNotFound")
+
+    def tokens(self, name):
+        return [params.get("pageToken") for resource, params in self.calls if resource == name]
+
+
+def collect(youtube, video_id="v1", **kwargs):
+    return [row for rows in iter_comment_pages(youtube, video_id, **kwargs) for row in rows]
+
+
+class PagingTests(unittest.TestCase):
+    def test_follows_next_page_token(self):
+        youtube = FakeYouTube({"v1": make_video(250)})
+        rows = collect(youtube)
+
+        self.assertEqual([r["comment_id"] for r in rows], [f"c{i}" for i in range(250)])
+        self.assertEqual(youtube.tokens("commentThreads"), [None, "100", "200"])
+
+    def test_pages_replies_beyond_the_inline_ones(self):
+        youtube = FakeYouTube({"v1": make_video(3, replies={0: 150, 1: 3})})
+        rows = collect(youtube)
+
+        replies = [r for r in rows if r["parent_id"] == "c0"]
+        self.assertEqual([r["comment_id"] for r in replies], [f"c0.r{j}" for j in range(150)])
+        self.assertEqual([r["comment_id"] for r in rows if r["parent_id"] == "c1"], ["c1.r0", "c1.r1", "c1.r2"])
+        # Only the thread with more replies than were embedded is paged, over two requests.
+        reply_calls = [params for resource, params in youtube.calls if resource == "comments"]
+        self.assertEqual([p["parentId"] for p in reply_calls], ["c0", "c0"])
+        self.assertEqual(youtube.tokens("comments"), [None, "100"])
+        self.assertEqual(len(rows), 3 + 150 + 3)
+
+    def test_without_replies(self):
+        youtube = FakeYouTube({"v1": make_video(3, replies={0: 150})})
+        rows = collect(youtube, include_replies=False)
+
+        self.assertEqual([r["comment_id"] for r in rows], ["c0", "c1", "c2"])
+        self.assertEqual(youtube.tokens("comments"), [])
+
+    def test_max_comments_cuts_off_and_stops_paging(self):
+        youtube = FakeYouTube({"v1": make_video(250)})
+        rows = collect(youtube, max_comments=150)
+
+        self.assertEqual([r["comment_id"] for r in rows], [f"c{i}" for i in range(150)])
+        self.assertEqual(youtube.tokens("commentThreads"), [None, "100"])
+
+    def test_max_comments_counts_replies(self):
+        youtube = FakeYouTube({"v1": make_video(10, replies={0: 20})})
+        rows = collect(youtube, max_comments=15)
+
+        self.assertEqual(len(rows), 15)
+        self.assertEqual(rows[0]["comment_id"], "c0")
+        self.assertTrue(all(r["parent_id"] == "c0" for r in rows[1:]))
+
+
+class BackoffTests(unittest.TestCase):
+    def setUp(self):
+        self.slept = []
+
+    def test_retries_rate_limit_and_server_errors_with_growing_delays(self):
+        failures = [http_error(403, "rateLimitExceeded"), http_error(429, ""), http_error(503, "backendError")]
+        youtube = FakeYouTube({"v1": make_video(5)}, failures)
+        rows = collect(youtube, base_delay=1.0, sleep=self.slept.append)
+
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(len(self.slept), 3)
+        for attempt, delay in enumerate(self.slept):
+            self.assertGreaterEqual(delay, 2 ** attempt)
+            self.assertLessEqual(delay, 2 ** attempt + 1)
+
+    def test_gives_up_after_max_retries(self):
+        youtube = FakeYouTube({"v1": make_video(5)}, [http_error(500, "backendError")] * 4)
+        with self.assertRaises(HttpError):
+            collect(youtube, max_retries=2, sleep=self.slept.append)
+        self.assertEqual(len(self.slept), 2)
+
+    def test_other_errors_are_not_retried(self):
+        youtube = FakeYouTube({"v1": make_video(5)}, [http_error(403, "commentsDisabled")])
+        with self.assertRaises(HttpError):
+            collect(youtube, sleep=self.slept.append)
+        self.assertEqual(self.slept, [])
+
+    def test_quota_exceeded_stops_without_retrying(self):
+        youtube = FakeYouTube({"v1": make_video(250)}, [])
+        pages = iter_comment_pages(youtube, "v1", sleep=self.slept.append)
+        self.assertEqual(len(next(pages)), 100)
+
+        youtube.failures.append(http_error(403, "quotaExceeded"))
+        with self.assertRaises(QuotaExceeded):
+            next(pages)
+        self.assertEqual(self.slept, [])
+        self.assertEqual(len(youtube.calls), 2)
+
+    def test_execute_with_backoff_returns_the_response(self):
+        youtube = FakeYouTube({"v1": make_video(1)}, [http_error(500, "")])
+        request = youtube.commentThreads().list(part="snippet", videoId="v1", maxResults=100)
+        response = execute_with_backoff(request, sleep=self.slept.append)
+        self.assertEqual(len(response["items"]), 1)
+
+
+class HarvestTests(unittest.TestCase):
+    def test_crawls_every_video_with_a_client_per_thread(self):
+        videos = {"v1": make_video(250, prefix="a"), "v2": make_video(30, replies={0: 120}, prefix="b"),
+                  "v3": make_video(0)}
+        clients = []
+
+        def client_factory():
+            clients.append(FakeYouTube(videos))
+            return clients[-1]
+
+        pages = list(harvest(["v1", "v2", "v1", "", "v3"], client_factory, max_workers=2, max_comments=200))
+
+        counts = {}
+        for page in pages:
+            for video_id, n in page["video_id"].value_counts().items():
+                counts[video_id] = counts.get(video_id, 0) + n
+        self.assertEqual(counts, {"v1": 200, "v2": 150})
+        self.assertLessEqual(len(clients), 2)
+
+    def test_quota_exceeded_reaches_the_caller(self):
+        def client_factory():
+            return FakeYouTube({"v1": make_video(5)}, [http_error(403, "quotaExceeded")])
+
+        with self.assertRaises(QuotaExceeded):
+            list(harvest(["v1"], client_factory))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,5 @@
+from .backends import BACKENDS, LexiconBackend, TextBlobBackend, get_backend
+from .cleaning import clean_series, clean_text
+from .scoring import analyze, get_sentiment, label_polarity, polarity, score_polarity
+from .store import SentimentStore, analyze_cached, load_cached_query
+from .stream import LiveSentiment, RecentIds, RollingCounts
@@ -0,0 +1,110 @@
+"""Pluggable polarity backends.
+
+`textblob` builds a TextBlob per text, as the apps always have. `lexicon`
+reads the same pattern lexicon TextBlob ships into flat dictionaries once and
+scores token lists directly, reproducing TextBlob's polarity on cleaned text
+(lowercase letters and whitespace, as produced by `clean_text`).
+
+The default backend is `textblob`; set SENTIMENT_BACKEND=lexicon, or pass
+`backend="lexicon"` to the scoring functions, to switch.
+"""
+import os
+
+from textblob import TextBlob
+
+
+DEFAULT_BACKEND = os.getenv("SENTIMENT_BACKEND", "textblob")
+
+
+class TextBlobBackend:
+    name = "textblob"
+
+    def polarity(self, text):
+        return TextBlob(text).sentiment.polarity
+
+    def score(self, texts):
+        return [self.polarity(t) for t in texts]
+
+
+class LexiconBackend:
+    """TextBlob's pattern analyzer over a precompiled lexicon.
+
+    Each known word maps to (polarity, intensity, is_modifier); negation and
+    modifier handling follow `textblob._text.Sentiment.assessments` for
+    alphabetic tokens. Text is tokenized on whitespace, which is what
+    TextBlob's tokenizer does to cleaned text.
+    """
+
+    name = "lexicon"
+
+    def __init__(self):
+        from textblob.en import sentiment as lexicon
+
+        lexicon.load()
+        self.negations = frozenset(lexicon.negations)
+        self.words = {
+            word: (tags[None][0], tags[None][2], any(tag in tags for tag in lexicon.modifiers))
+            for word, tags in dict.items(lexicon)
+        }
+
+    def polarity(self, text):
+        return self.score_tokens(text.split())
+
+    def score(self, texts):
+        return [self.score_tokens(t.split()) for t in texts]
+
+    def score_tokenized(self, token_lists):
+        return [self.score_tokens(tokens) for tokens in token_lists]
+
+    def score_tokens(self, tokens):
+        words = self.words
+        negations = self.negations
+        found = []  # [polarity, intensity, negated] per assessed chunk
+        modifier = None
+        negation = None
+        for w in tokens:
+            entry = words.get(w)
+            if entry is not None:
+                p, i, is_modifier = entry
+                if modifier is None:
+                    found.append([p, i, False])
+                else:
+                    last = found[-1]
+                    last[0] = max(-1.0, min(p * last[1], 1.0))
+                    last[1] = i
+                if negation is not None:
+                    found[-1][1] = 1.0 / found[-1][1]
+                    found[-1][2] = True
+                modifier = w if is_modifier else None
+                negation = w if w in negations else None
+            else:
+                if w in negations:
+                    negation = w
+                elif negation and len(w.strip("'")) > 1:
+                    negation = None
+                if negation is not None and modifier is not None and modifier.endswith("ly"):
+                    found[-1][2] = True
+                    negation = None
+                elif modifier and len(w) > 2:
+                    modifier = None
+        if not found:
+            return 0.0
+        return sum(p * -0.5 if negated else p for p, _, negated in found) / len(found)
+
+
+BACKENDS = {
+    TextBlobBackend.name: TextBlobBackend,
+    LexiconBackend.name: LexiconBackend,
+}
+
+_instances = {}
+
+
+def get_backend(name=None):
+    """Return the shared instance of backend `name` (default: SENTIMENT_BACKEND)."""
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown sentiment backend {name!r}; choose from {', '.join(BACKENDS)}")
+    if name not in _instances:
+        _instances[name] = BACKENDS[name]()
+    return _instances[name]
@@ -0,0 +1,88 @@
+"""Parity report and benchmark of the lexicon backend against TextBlob.
+
+Both backends score the same cleaned texts on one core; the report shows how
+often polarity and the Positive/Neutral/Negative label agree and the speedup.
+
+Usage:
+    python -m sentiment_engine.benchmark --texts 100000
+    python -m sentiment_engine.benchmark --input tweets.jsonl --strip-mentions
+"""
+import argparse
+import itertools
+import random
+import time
+
+from .backends import LexiconBackend, TextBlobBackend
+from .cleaning import clean_text
+from .scoring import label_polarity
+
+
+FILLER = ("i you it this that the a movie video song people today was is are so and but "
+          "just like what really very quite not no never dont cant lol").split()
+
+
+def synthetic_texts(n, seed=0):
+    """Tweet-like texts mixing lexicon words, modifiers, negations, filler, links and mentions."""
+    rng = random.Random(seed)
+    vocab = sorted(w for w in LexiconBackend().words if w.isalpha())
+    texts = []
+    for _ in range(n):
+        words = [rng.choice(vocab) if rng.random() < 0.3 else rng.choice(FILLER)
+                 for _ in range(rng.randint(3, 30))]
+        if rng.random() < 0.3:
+            words.append(f"@user{rng.randint(0, 999)}")
+        if rng.random() < 0.2:
+            words.append("https://t.co/abc123")
+        texts.append(" ".join(words) + rng.choice(["", "!", "!!", "...", " :)"]))
+    return texts
+
+
+def _timed(backend, texts):
+    start = time.perf_counter()
+    scores = backend.score(texts)
+    return scores, time.perf_counter() - start
+
+
+def report(texts, tolerance=1e-9, examples=5):
+    reference, reference_time = _timed(TextBlobBackend(), texts)
+    lexicon = LexiconBackend()
+    candidate, candidate_time = _timed(lexicon, texts)
+
+    diffs = [abs(a - b) for a, b in zip(reference, candidate)]
+    same_label = sum(label_polarity(a) == label_polarity(b) for a, b in zip(reference, candidate))
+    mismatches = [(t, a, b) for t, a, b, d in zip(texts, reference, candidate, diffs) if d > tolerance]
+    n = len(texts)
+
+    print(f"Texts scored:         {n:,}")
+    print(f"Polarity parity:      {n - len(mismatches):,}/{n:,} within {tolerance:g} "
+          f"(max abs diff {max(diffs, default=0):.3g})")
+    print(f"Label agreement:      {same_label:,}/{n:,} ({same_label / max(n, 1):.4%})")
+    print(f"textblob:             {reference_time:.2f}s ({n / max(reference_time, 1e-9):,.0f} texts/sec)")
+    print(f"lexicon:              {candidate_time:.2f}s ({n / max(candidate_time, 1e-9):,.0f} texts/sec)")
+    print(f"Speedup:              {reference_time / max(candidate_time, 1e-9):.1f}x")
+    for text, a, b in mismatches[:examples]:
+        print(f"  mismatch: textblob={a:.4f} lexicon={b:.4f} {text!r}")
+    return len(mismatches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the lexicon polarity backend with TextBlob.")
+    parser.add_argument("--texts", type=int, default=100_000, help="number of texts to score")
+    parser.add_argument("--input", help="JSONL or CSV dump to sample texts from instead of synthetic ones")
+    parser.add_argument("--text-field", help="text field of --input (auto-detected by default)")
+    parser.add_argument("--strip-mentions", action="store_true", help="clean as the Twitter app does")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.input:
+        from .bulk import iter_records
+
+        raw = [text for _, text in itertools.islice(iter_records(args.input, args.text_field), args.texts)]
+    else:
+        raw = synthetic_texts(args.texts, args.seed)
+    texts = [clean_text(t, strip_mentions=args.strip_mentions) for t in raw]
+    raise SystemExit(1 if report(texts) else 0)
+
+
+if __name__ == "__main__":
+    main()
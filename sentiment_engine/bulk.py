@@ -0,0 +1,227 @@
+"""Clean and score archived tweet / comment dumps (JSONL or CSV) into Parquet.
+
+Input files are streamed record by record and cut into batches that are
+cleaned and scored across a pool of worker processes. Every batch becomes one
+Parquet part file; a checkpoint written after each part records how many
+records and bytes of each input are done, so a crashed run seeks straight
+back to where it stopped.
+
+Usage:
+    python -m sentiment_engine.bulk tweets-*.jsonl --output scored/ --strip-mentions
+    python -m sentiment_engine.bulk comments.csv --output scored/ --text-field Comment --workers 16
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .backends import BACKENDS, DEFAULT_BACKEND
+from .cleaning import clean_series
+from .scoring import label_polarity, score_polarity
+
+
+TEXT_FIELDS = ["text", "Tweet", "Comment", "textDisplay", "body"]
+ID_FIELDS = ["id", "tweet_id", "comment_id"]
+CHECKPOINT_NAME = "_checkpoint.json"
+OUTPUT_SCHEMA = pa.schema([
+    ("source", pa.string()),
+    ("record", pa.int64()),
+    ("id", pa.string()),
+    ("text", pa.string()),
+    ("cleaned", pa.string()),
+    ("polarity", pa.float64()),
+    ("sentiment", pa.string()),
+])
+
+
+def _pick(record, explicit, candidates):
+    if explicit:
+        return explicit
+    return next((field for field in candidates if field in record), None)
+
+
+def iter_records(path, text_field=None, id_field=None, skip=0):
+    """Yield (id, text) for every record of a JSONL or CSV file, after the first `skip`."""
+    for item_id, text, _ in _iter_rows(path, text_field, id_field, skip=skip):
+        yield item_id, text
+
+
+def _iter_rows(path, text_field=None, id_field=None, skip=0, offset=0):
+    """Yield (id, text, end) like `iter_records`, starting at byte `offset` of the file.
+
+    `end` is the byte offset just past the record, so a resumed run can seek
+    straight to it. Skipped JSONL lines are not decoded.
+    """
+    path = Path(path)
+    is_csv = path.suffix.lower() == ".csv"
+    with open(path, "rb") as f:
+        end = 0
+
+        def lines():
+            nonlocal end
+            for line in f:
+                end += len(line)
+                yield line.decode("utf-8")
+
+        if is_csv:
+            records = csv.DictReader(lines())
+            records.fieldnames  # read the header before seeking past it
+        else:
+            records = (line for line in lines() if line.strip())
+        if offset:
+            f.seek(offset)
+            end = offset
+
+        fields = None
+        for n, record in enumerate(records):
+            if n < skip:
+                continue
+            if not is_csv:
+                record = json.loads(record)
+            if fields is None:
+                fields = (_pick(record, text_field, TEXT_FIELDS), _pick(record, id_field, ID_FIELDS))
+                if fields[0] is None:
+                    raise ValueError(f"{path}: no text field found; pass --text-field")
+            text = record.get(fields[0])
+            item_id = record.get(fields[1]) if fields[1] else None
+            yield (None if item_id is None else str(item_id)), ("" if text is None else str(text)), end
+
+
+def score_batch(source, start, ids, texts, strip_mentions=False, backend=None):
+    """Clean and score one batch; returns it as an Arrow table in OUTPUT_SCHEMA."""
+    cleaned = clean_series(pd.Series(texts, dtype=object), strip_mentions=strip_mentions)
+    polarity = score_polarity(cleaned, workers=1, backend=backend)
+    return pa.Table.from_pydict({
+        "source": [source] * len(texts),
+        "record": list(range(start, start + len(texts))),
+        "id": ids,
+        "text": texts,
+        "cleaned": cleaned.tolist(),
+        "polarity": polarity.tolist(),
+        "sentiment": polarity.map(label_polarity).tolist(),
+    }, schema=OUTPUT_SCHEMA)
+
+
+def _load_checkpoint(path):
+    if path.exists():
+        return json.loads(path.read_text())
+    return {"files": {}, "next_part": 0, "docs": 0}
+
+
+def _save_checkpoint(path, checkpoint):
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(checkpoint, indent=2))
+    os.replace(tmp, path)
+
+
+def _iter_batches(inputs, checkpoint, batch_size, text_field, id_field):
+    """Yield ("batch", source, start, end, ids, texts) and ("eof", source) in input order.
+
+    `end` is the byte offset just past the batch's last record.
+    """
+    for path in inputs:
+        source = str(Path(path).resolve())
+        state = checkpoint["files"].setdefault(source, {"records": 0, "offset": 0, "done": False})
+        if state["done"]:
+            continue
+        start = state["records"]
+        if "offset" in state:
+            rows = _iter_rows(path, text_field, id_field, offset=state["offset"])
+        else:  # checkpoint from before byte offsets were recorded
+            rows = _iter_rows(path, text_field, id_field, skip=start)
+        ids, texts = [], []
+        for item_id, text, end in rows:
+            ids.append(item_id)
+            texts.append(text)
+            if len(texts) == batch_size:
+                yield "batch", source, start, end, ids, texts
+                start += len(texts)
+                ids, texts = [], []
+        if texts:
+            yield "batch", source, start, end, ids, texts
+        yield "eof", source
+
+
+def run(inputs, output_dir, batch_size=50_000, workers=None, strip_mentions=False,
+        text_field=None, id_field=None, backend=None, log=sys.stderr):
+    """Score `inputs` into Parquet parts under `output_dir`. Returns (docs, seconds) for this run."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    checkpoint_path = output_dir / CHECKPOINT_NAME
+    checkpoint = _load_checkpoint(checkpoint_path)
+    workers = workers or os.cpu_count() or 1
+
+    started = time.perf_counter()
+    docs = 0
+
+    def finish(entry):
+        nonlocal docs
+        if entry[0] == "eof":
+            checkpoint["files"][entry[1]]["done"] = True
+        else:
+            _, source, start, end, future = entry
+            table = future.result()
+            part = output_dir / f"part-{checkpoint['next_part']:05d}.parquet"
+            # Underscore-prefixed files are ignored by Parquet dataset readers.
+            tmp = output_dir / f"_{part.name}.tmp"
+            pq.write_table(table, tmp)
+            os.replace(tmp, part)
+            checkpoint["next_part"] += 1
+            checkpoint["docs"] += table.num_rows
+            checkpoint["files"][source].update(records=start + table.num_rows, offset=end)
+            docs += table.num_rows
+            elapsed = time.perf_counter() - started
+            print(f"{part.name}: {checkpoint['docs']:,} docs total, "
+                  f"{docs / max(elapsed, 1e-9):,.0f} docs/sec", file=log)
+        _save_checkpoint(checkpoint_path, checkpoint)
+
+    # Results are written strictly in input order, so the checkpoint never
+    # claims a record whose part file does not exist yet.
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for kind, source, *batch in _iter_batches(inputs, checkpoint, batch_size, text_field, id_field):
+            if kind == "eof":
+                pending.append(("eof", source))
+            else:
+                start, end, ids, texts = batch
+                pending.append(("batch", source, start, end,
+                                pool.submit(score_batch, source, start, ids, texts, strip_mentions, backend)))
+            while len(pending) > workers * 2 or (pending and pending[0][0] == "eof"):
+                finish(pending.popleft())
+        while pending:
+            finish(pending.popleft())
+
+    return docs, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean and score archived tweets / comments into Parquet.")
+    parser.add_argument("inputs", nargs="+", help="JSONL or CSV files (.csv is read as CSV, anything else as JSONL)")
+    parser.add_argument("--output", required=True, help="directory for part-NNNNN.parquet files and the checkpoint")
+    parser.add_argument("--text-field", help=f"field holding the text (default: first of {', '.join(TEXT_FIELDS)})")
+    parser.add_argument("--id-field", help=f"field holding the id (default: first of {', '.join(ID_FIELDS)})")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="records per batch and per part file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--strip-mentions", action="store_true", help="also drop @mentions and # (as for tweets)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=DEFAULT_BACKEND, help="polarity backend")
+    args = parser.parse_args()
+
+    docs, elapsed = run(
+        args.inputs, args.output, batch_size=args.batch_size, workers=args.workers,
+        strip_mentions=args.strip_mentions, text_field=args.text_field, id_field=args.id_field,
+        backend=args.backend,
+    )
+    print(f"Scored {docs:,} docs in {elapsed:.2f}s ({docs / max(elapsed, 1e-9):,.0f} docs/sec) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import re
+
+URL_RE = re.compile(r"http\S+")
+MENTION_RE = re.compile(r"@\w+")
+HASH_RE = re.compile(r"#")
+NON_ALPHA_RE = re.compile(r"[^a-z\s]")
+
+
+def clean_text(text, strip_mentions=False):
+    text = text.lower()
+    text = URL_RE.sub("", text)
+    if strip_mentions:
+        text = MENTION_RE.sub("", text)
+        text = HASH_RE.sub("", text)
+    text = NON_ALPHA_RE.sub("", text)
+    return text
+
+
+def clean_series(texts, strip_mentions=False):
+    """Vectorized `clean_text` over a pandas Series of strings."""
+    texts = texts.fillna("").astype(str).str.lower().str.replace(URL_RE, "", regex=True)
+    if strip_mentions:
+        texts = texts.str.replace(MENTION_RE, "", regex=True).str.replace(HASH_RE, "", regex=True)
+    return texts.str.replace(NON_ALPHA_RE, "", regex=True)
@@ -0,0 +1,63 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .backends import DEFAULT_BACKEND, get_backend
+from .cleaning import clean_series
+
+
+# Below this many distinct texts a process pool costs more than it saves.
+PARALLEL_THRESHOLD = 5000
+BATCH_SIZE = 2000
+
+
+def polarity(text, backend=None):
+    return get_backend(backend).polarity(text)
+
+
+def label_polarity(value):
+    if value > 0:
+        return "Positive"
+    elif value < 0:
+        return "Negative"
+    else:
+        return "Neutral"
+
+
+def get_sentiment(text, backend=None):
+    return label_polarity(polarity(text, backend))
+
+
+def _polarity_batch(texts, backend=None):
+    return get_backend(backend).score(texts)
+
+
+def score_polarity(texts, workers=None, batch_size=BATCH_SIZE, parallel_threshold=PARALLEL_THRESHOLD,
+                   backend=None):
+    """Polarity for every text in `texts`, computing each distinct text exactly once.
+
+    Large inputs are split into batches and scored across a process pool.
+    """
+    texts = pd.Series(texts)
+    unique = texts.drop_duplicates().tolist()
+    backend = backend or DEFAULT_BACKEND
+
+    if len(unique) < parallel_threshold or workers == 1:
+        scores = _polarity_batch(unique, backend)
+    else:
+        batches = [unique[i:i + batch_size] for i in range(0, len(unique), batch_size)]
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            results = pool.map(_polarity_batch, batches, [backend] * len(batches))
+            scores = [s for batch in results for s in batch]
+
+    lookup = dict(zip(unique, scores))
+    return texts.map(lookup).astype(float)
+
+
+def analyze(df, text_column, strip_mentions=False, workers=None, backend=None):
+    """Add Cleaned, Polarity and Sentiment columns to `df` in place and return it."""
+    df["Cleaned"] = clean_series(df[text_column], strip_mentions=strip_mentions)
+    df["Polarity"] = score_polarity(df["Cleaned"], workers=workers, backend=backend).to_numpy()
+    df["Sentiment"] = df["Polarity"].map(label_polarity)
+    return df
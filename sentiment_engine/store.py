@@ -0,0 +1,184 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from .scoring import analyze, label_polarity
+
+
+DEFAULT_PATH = Path(os.getenv(
+    "SENTIMENT_CACHE_PATH",
+    Path(__file__).resolve().parent.parent / ".cache" / "sentiment.sqlite3",
+))
+ITEM_TTL = 7 * 24 * 3600
+QUERY_TTL = 15 * 60
+MAX_ITEMS = 500_000
+RECOUNT_SECONDS = 60  # other processes' inserts only show up in COUNT(*)
+EVICT_TO = 0.9  # evicting below the cap leaves room for many inserts before the table is counted again
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    source TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    raw TEXT NOT NULL,
+    cleaned TEXT NOT NULL,
+    polarity REAL NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (source, item_id)
+);
+CREATE INDEX IF NOT EXISTS items_fetched_at ON items (fetched_at);
+CREATE TABLE IF NOT EXISTS queries (
+    source TEXT NOT NULL,
+    query TEXT NOT NULL,
+    item_ids TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (source, query)
+);
+CREATE TABLE IF NOT EXISTS cursors (
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (source, key)
+);
+"""
+
+
+class SentimentStore:
+    """SQLite cache of fetched posts and their scores, shared across restarts and replicas.
+
+    Items are keyed by (source, id) and expire after `item_ttl` seconds; the
+    oldest items are evicted once there are more than `max_items`, down to
+    90% of it. Each process keeps a running item count and re-reads the real
+    one at least every `RECOUNT_SECONDS`, so other replicas' inserts can push
+    the table past `max_items` only briefly. Query results (the ids a search
+    returned) are kept for `query_ttl` seconds so a repeated search can skip
+    the API entirely. Cursors (e.g. the newest id polled for a search)
+    never expire.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, item_ttl=ITEM_TTL, query_ttl=QUERY_TTL, max_items=MAX_ITEMS):
+        self.path = Path(path)
+        self.item_ttl = item_ttl
+        self.query_ttl = query_ttl
+        self.max_items = max_items
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._count = None  # items in the table as of the last COUNT(*), plus inserts since, minus deletes
+        self._counted_at = 0.0
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def get_items(self, source, item_ids):
+        """Return cached rows (item_id, raw, cleaned, polarity) for the ids still fresh."""
+        item_ids = [str(i) for i in item_ids]
+        cutoff = time.time() - self.item_ttl
+        rows = []
+        with self._lock:
+            for i in range(0, len(item_ids), 500):
+                batch = item_ids[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows += self._conn.execute(
+                    f"SELECT item_id, raw, cleaned, polarity FROM items "
+                    f"WHERE source = ? AND fetched_at >= ? AND item_id IN ({placeholders})",
+                    [source, cutoff, *batch],
+                ).fetchall()
+        return pd.DataFrame(rows, columns=["item_id", "raw", "cleaned", "polarity"])
+
+    def put_items(self, source, item_ids, raw, cleaned, polarity):
+        now = time.time()
+        rows = [(source, str(i), r, c, float(p), now) for i, r, c, p in zip(item_ids, raw, cleaned, polarity)]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._evict(len(rows))
+
+    def get_query(self, source, query):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT item_ids FROM queries WHERE source = ? AND query = ? AND fetched_at >= ?",
+                (source, query, time.time() - self.query_ttl),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_query(self, source, query, item_ids):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO queries VALUES (?, ?, ?, ?)",
+                (source, query, json.dumps([str(i) for i in item_ids]), time.time()),
+            )
+
+    def get_cursor(self, source, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cursors WHERE source = ? AND key = ?", (source, key)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_cursor(self, source, key, value):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cursors VALUES (?, ?, ?, ?)",
+                (source, key, json.dumps(value), time.time()),
+            )
+
+    def _evict(self, added):
+        now = time.time()
+        expired = self._conn.execute("DELETE FROM items WHERE fetched_at < ?", (now - self.item_ttl,)).rowcount
+        self._conn.execute("DELETE FROM queries WHERE fetched_at < ?", (now - self.query_ttl,))
+        # Keep a running count and only run COUNT(*) when it says the table may have passed
+        # max_items, or when it is old enough to be missing other replicas' inserts.
+        if (self._count is not None and self._count + added - expired <= self.max_items
+                and now - self._counted_at < RECOUNT_SECONDS):
+            self._count += added - expired
+            return
+        self._count = self._conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        self._counted_at = now
+        excess = self._count - int(self.max_items * EVICT_TO)
+        if self._count > self.max_items:
+            self._conn.execute(
+                "DELETE FROM items WHERE rowid IN (SELECT rowid FROM items ORDER BY fetched_at LIMIT ?)",
+                (excess,),
+            )
+            self._count -= excess
+
+    def close(self):
+        self._conn.close()
+
+
+def analyze_cached(df, text_column, id_column, source, store, strip_mentions=False, workers=None, backend=None):
+    """Like `analyze`, but reuses scores stored for ids seen before and stores the new ones."""
+    ids = df[id_column].astype(str)
+    cached = store.get_items(source, ids.unique()).set_index("item_id")
+    seen = ids.isin(cached.index)
+
+    df["Cleaned"] = ids.map(cached["cleaned"]).astype(object)
+    df["Polarity"] = ids.map(cached["polarity"]).astype(float)
+    if (~seen).any():
+        fresh = analyze(df.loc[~seen, [text_column]].copy(), text_column, strip_mentions, workers, backend)
+        df.loc[~seen, "Cleaned"] = fresh["Cleaned"]
+        df.loc[~seen, "Polarity"] = fresh["Polarity"]
+        store.put_items(source, ids[~seen], df.loc[~seen, text_column], fresh["Cleaned"], fresh["Polarity"])
+    df["Sentiment"] = df["Polarity"].map(label_polarity)
+    return df
+
+
+def load_cached_query(source, query, store):
+    """Rebuild a previous query's rows (item_id, raw, Cleaned, Polarity, Sentiment) from the store.
+
+    Returns None when the query is unknown, expired or some of its items were evicted.
+    """
+    item_ids = store.get_query(source, query)
+    if item_ids is None:
+        return None
+    rows = store.get_items(source, item_ids).set_index("item_id")
+    if len(rows) < len(set(item_ids)):
+        return None
+    df = rows.reindex(item_ids).reset_index()
+    df = df.rename(columns={"cleaned": "Cleaned", "polarity": "Polarity"})
+    df["Sentiment"] = df["Polarity"].map(label_polarity)
+    return df
@@ -0,0 +1,109 @@
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+
+LABELS = ["Positive", "Neutral", "Negative"]
+
+
+class RollingCounts:
+    """Per-bucket sentiment counts for the last `size` buckets, held in a ring buffer.
+
+    Memory is fixed at `size` x 3 counters; adding items costs O(len(items))
+    and moving the window forward only clears the slots it passes over.
+    """
+
+    def __init__(self, bucket_seconds, size):
+        self.bucket_seconds = bucket_seconds
+        self.size = size
+        self.counts = np.zeros((size, len(LABELS)), dtype=np.int64)
+        self.newest = None
+
+    def advance(self, timestamp):
+        """Move the window so it ends at the bucket containing `timestamp`."""
+        bucket = int(timestamp // self.bucket_seconds)
+        if self.newest is None:
+            self.newest = bucket
+        elif bucket > self.newest:
+            start = max(self.newest + 1, bucket - self.size + 1)
+            self.counts[np.arange(start, bucket + 1) % self.size] = 0
+            self.newest = bucket
+
+    def add(self, timestamps, labels):
+        """Count items given their epoch-second timestamps and sentiment labels."""
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if not len(timestamps):
+            return
+        self.advance(timestamps.max())
+        buckets = (timestamps // self.bucket_seconds).astype(np.int64)
+        codes = pd.Categorical(labels, categories=LABELS).codes
+        keep = (buckets > self.newest - self.size) & (codes >= 0)
+        np.add.at(self.counts, (buckets[keep] % self.size, codes[keep]), 1)
+
+    def frame(self):
+        """Counts per bucket, oldest first, indexed by the bucket's start time (UTC)."""
+        if self.newest is None:
+            return pd.DataFrame(columns=LABELS, dtype=np.int64)
+        buckets = np.arange(self.newest - self.size + 1, self.newest + 1)
+        index = pd.to_datetime(buckets * self.bucket_seconds, unit="s", utc=True)
+        return pd.DataFrame(self.counts[buckets % self.size], index=index, columns=LABELS)
+
+
+class RecentIds:
+    """Remembers the last `maxlen` ids so re-polled items are not counted twice."""
+
+    def __init__(self, maxlen=10_000):
+        self._order = deque()
+        self._ids = set()
+        self.maxlen = maxlen
+
+    def __contains__(self, item_id):
+        return item_id in self._ids
+
+    def filter_new(self, item_ids):
+        """Return a boolean mask of ids not seen before, and remember them."""
+        mask = []
+        for item_id in item_ids:
+            new = item_id not in self._ids
+            mask.append(new)
+            if new:
+                self._ids.add(item_id)
+                self._order.append(item_id)
+                if len(self._order) > self.maxlen:
+                    self._ids.discard(self._order.popleft())
+        return np.array(mask, dtype=bool)
+
+
+class LiveSentiment:
+    """Rolling per-minute and per-hour sentiment counts for a live feed.
+
+    Feed it only newly scored items; everything it keeps is fixed-size, so a
+    dashboard can poll for hours without growing memory or redraw cost.
+    """
+
+    def __init__(self, minutes=60, hours=48, max_seen=10_000):
+        self.per_minute = RollingCounts(60, minutes)
+        self.per_hour = RollingCounts(3600, hours)
+        self.seen = RecentIds(max_seen)
+        self.totals = pd.Series(0, index=LABELS, dtype=np.int64)
+        self.cursor = None
+
+    def update(self, df, time_column=None, now=None):
+        """Add scored rows (with a Sentiment column); timestamps default to now."""
+        now = time.time() if now is None else now
+        for counts in (self.per_minute, self.per_hour):
+            counts.advance(now)
+        if not len(df):
+            return self
+        if time_column is not None:
+            times = pd.to_datetime(df[time_column], utc=True, errors="coerce")
+            timestamps = (times.astype("int64") // 10**9).where(times.notna(), now).to_numpy()
+        else:
+            timestamps = np.full(len(df), now)
+        labels = df["Sentiment"].to_numpy()
+        self.per_minute.add(timestamps, labels)
+        self.per_hour.add(timestamps, labels)
+        self.totals += df["Sentiment"].value_counts().reindex(LABELS, fill_value=0)
+        return self